@@ -0,0 +1,289 @@
+import os
+import time
+import logging
+import importlib
+from datetime import datetime
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from models import FundingRate
+from instruments import index as instruments
+
+logger = logging.getLogger("Adapters")
+logger.setLevel(logging.INFO)
+
+
+@dataclass(frozen=True)
+class AdapterSpec:
+    """Declarative description of one venue's funding-rate endpoint.
+
+    `rows` is a key path into the payload (empty = payload itself) or a callable returning rows.
+    `symbol` maps a row to a (base, quote, margin) key (see `listed`) or a symbol string, or
+    returns None to skip the row; either form is interned into `instruments.index`.
+    `rate` is a row key or a callable; the raw value is multiplied by `scale` (to percent).
+    """
+    name: str
+    url: str
+    symbol: Callable[[dict], Optional[str]]
+    rate: Union[str, Callable[[dict], Any]] = "fundingRate"
+    ok: Callable[[Any], bool] = bool
+    rows: Union[Tuple[str, ...], Callable[[Any], Iterable[dict]]] = ()
+    scale: float = 100.0
+    mode: str = "std"
+    method: str = "GET"
+    headers: Optional[dict] = None
+    body: Optional[dict] = None
+    fallback_urls: Tuple[str, ...] = ()   # tried in order while the previous URL yields nothing
+    mirrors: Tuple[str, ...] = ()         # other hosts serving the same payload as `url`; raced by latency
+    unique: bool = False                  # keep only the first row per instrument
+    # Optional extras read in the same pass (row key or callable); a bad value leaves the field None
+    mark: Union[str, Callable[[dict], Any], None] = None
+    index: Union[str, Callable[[dict], Any], None] = None
+    next_funding: Union[str, Callable[[dict], Any], None] = None   # epoch seconds or milliseconds
+    # Venue event time: per row (row key or callable), else once per payload (callable on the payload)
+    event_time: Union[str, Callable[[dict], Any], None] = None
+    payload_time: Optional[Callable[[Any], Any]] = None
+
+
+# SHARED PARSE PATH
+def parse(spec: AdapterSpec, data: Any, ts: float) -> List[FundingRate]:
+    if not data: return []
+    try:
+        if not spec.ok(data): return []
+        rows = spec.rows(data) if callable(spec.rows) else _dig(data, spec.rows)
+    except (KeyError, TypeError, AttributeError, IndexError):
+        return []
+
+    name, scale, get_symbol = spec.name, spec.scale, spec.symbol
+    get_rate = _getter(spec.rate)
+    extras = [(field, _getter(key), conv) for field, key, conv in (
+        ("mark_price", spec.mark, _num), ("index_price", spec.index, _num), ("next_funding_time", spec.next_funding, _epoch),
+        ("event_time", spec.event_time, _epoch),
+    ) if key is not None]
+    try:
+        stamp = {"event_time": _epoch(spec.payload_time(data))} if spec.payload_time else {}
+    except (KeyError, TypeError, AttributeError):
+        stamp = {}
+    seen = set() if spec.unique else None
+    intern, codes = instruments.intern, instruments.codes
+    # Values are converted by hand below, so skip per-row pydantic validation
+    construct = FundingRate.model_construct
+
+    res = []
+    for row in rows:
+        try:
+            key = get_symbol(row)
+            if not key: continue
+            raw = get_rate(row)
+            if raw is None or raw == "": continue
+            iid = intern(key)
+            if seen is not None:
+                if iid in seen: continue
+                seen.add(iid)
+            fields = {field: conv(get(row)) for field, get, conv in extras} if extras else {}
+            if stamp and fields.get("event_time") is None: fields.update(stamp)
+            res.append(construct(exchange=name, symbol=codes[iid], rate=float(raw) * scale, timestamp=ts,
+                                 instrument=iid, **fields))
+        except (KeyError, TypeError, ValueError, AttributeError):
+            continue
+    return res
+
+def _getter(key: Union[str, Callable[[dict], Any]]) -> Callable[[dict], Any]:
+    return key if callable(key) else (lambda row: row.get(key))
+
+def _num(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+def _epoch(value: Any) -> Optional[float]:
+    t = _num(value)
+    if t is None and isinstance(value, str):
+        try:
+            t = datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    if not t: return None
+    while t > 1e11: t /= 1000.0  # milli/micro/nanoseconds -> seconds
+    return t
+
+def _dig(data: Any, path: Tuple[str, ...]) -> Any:
+    for key in path:
+        data = data.get(key) or {}
+    return data or []
+
+
+# SYMBOL HELPERS
+def listed(key: str, quotes: Union[Tuple[str, ...], Dict[str, str]] = ("USDT",), sep: str = "", strip: str = "",
+           inverse: Tuple[str, ...] = ()) -> Callable[[dict], Optional[Tuple[str, str, str]]]:
+    """Row key holding '<base><sep><suffix><strip>' -> (base, quote, margin).
+
+    `quotes` lists accepted suffixes, or maps suffix -> quote (e.g. {'USDTM': 'USDT'});
+    quotes in `inverse` are coin-margined contracts. Other rows are skipped.
+    """
+    mapping = quotes if isinstance(quotes, dict) else {q: q for q in quotes}
+    suffixes = sorted(((sep + s, q) for s, q in mapping.items()), key=lambda x: -len(x[0]))
+    def extract(row: dict) -> Optional[Tuple[str, str, str]]:
+        sym = row.get(key) or ''
+        if strip:
+            if not sym.endswith(strip): return None
+            sym = sym[:-len(strip)]
+        for suffix, quote in suffixes:
+            if sym.endswith(suffix) and len(sym) > len(suffix):
+                return (sym[:-len(suffix)], quote, 'inverse' if quote in inverse else 'linear')
+        return None
+    return extract
+
+def suffixed(key: str, suffix: str, transform: Callable[[str], str] = None) -> Callable[[dict], Optional[str]]:
+    def extract(row: dict) -> Optional[str]:
+        sym = row.get(key) or ''
+        if not sym.endswith(suffix): return None
+        return transform(sym) if transform else sym
+    return extract
+
+def _kraken_symbol(row: dict) -> Optional[Tuple[str, str, str]]:
+    # PF_ = multi-collateral linear perps, PI_ = inverse perps; both quoted in USD
+    sym = row.get('symbol', '').upper()
+    if 'fundingRate' not in row or not sym.endswith('USD') or sym[:3] not in ('PF_', 'PI_'): return None
+    return (sym[3:-3], 'USD', 'inverse' if sym.startswith('PI_') else 'linear')
+
+def _bitmex_symbol(row: dict) -> Optional[Tuple[str, str, str]]:
+    if row.get('typ') != 'FFWCSX' or not row.get('underlying') or not row.get('quoteCurrency'): return None
+    return (row['underlying'], row['quoteCurrency'], 'inverse' if row.get('isInverse') else 'linear')
+
+def _hyperliquid_ok(data: Any) -> bool:
+    if not isinstance(data, list) or len(data) < 2: return False
+    universe = data[0].get('universe', []) if isinstance(data[0], dict) else data[0]
+    return len(universe) == len(data[1])
+
+def _hyperliquid_rows(data: list) -> Iterable[dict]:
+    universe = data[0].get('universe', []) if isinstance(data[0], dict) else data[0]
+    for u, c in zip(universe, data[1]):
+        yield {'name': u.get('name'), 'funding': c.get('funding'), 'markPx': c.get('markPx'), 'oraclePx': c.get('oraclePx')}
+
+def _next_hour(row: dict) -> float:
+    # Hyperliquid settles every hour on the hour
+    return (time.time() // 3600 + 1) * 3600
+
+
+# REGISTRY
+REGISTRY: Dict[str, AdapterSpec] = {}
+
+def register(spec: AdapterSpec) -> AdapterSpec:
+    REGISTRY[spec.name] = spec
+    return spec
+
+for _spec in (
+    AdapterSpec("Binance", "https://fapi.binance.com/fapi/v1/premiumIndex", mode='browser',
+                ok=lambda d: isinstance(d, list), symbol=listed('symbol', ('USDT', 'USDC')),
+                rate='lastFundingRate', mark='markPrice', index='indexPrice', next_funding='nextFundingTime',
+                event_time='time'),
+    AdapterSpec("Bybit", "https://api.bybit.com/v5/market/tickers?category=linear", mode='browser',
+                mirrors=("https://api.bytick.com/v5/market/tickers?category=linear",),
+                ok=lambda d: d.get('retCode') == 0, rows=('result', 'list'),
+                symbol=listed('symbol', {'USDT': 'USDT', 'USDC': 'USDC', 'PERP': 'USDC'}),
+                mark='markPrice', index='indexPrice', next_funding='nextFundingTime', payload_time=lambda d: d.get('time')),
+    AdapterSpec("OKX", "https://www.okx.com/priapi/v5/public/tickers?instType=SWAP", mode='browser',
+                mirrors=("https://aws.okx.com/priapi/v5/public/tickers?instType=SWAP",),
+                headers={"Referer": "https://www.okx.com/trade-swap"},
+                ok=lambda d: d.get('code') == '0', rows=('data',),
+                symbol=listed('instId', ('USDT', 'USDC', 'USD'), sep='-', strip='-SWAP', inverse=('USD',)),
+                # fundingTime is the upcoming settlement; nextFundingTime is the one after it
+                mark='markPx', index='idxPx', next_funding=lambda i: i.get('fundingTime') or i.get('nextFundingTime'),
+                event_time='ts'),
+    AdapterSpec("GateIO", "https://api.gateio.ws/api/v4/futures/usdt/tickers",
+                ok=lambda d: isinstance(d, list), symbol=listed('contract', sep='_'), rate='funding_rate',
+                mark='mark_price', index='index_price'),
+    AdapterSpec("KuCoin", "https://api-futures.kucoin.com/api/v1/contracts/active",
+                ok=lambda d: d.get('code') == '200000', rows=('data',),
+                symbol=listed('symbol', {'USDTM': 'USDT', 'USDCM': 'USDC', 'USDM': 'USD'}, inverse=('USD',)),
+                rate='fundingFeeRate', mark='markPrice', index='indexPrice', next_funding='nextFundingRateDateTime'),
+    AdapterSpec("Bitget", "https://api.bitget.com/api/v2/mix/market/tickers?productType=USDT-FUTURES",
+                ok=lambda d: d.get('code') == '00000', rows=('data',), symbol=listed('symbol'),
+                mark='markPrice', index='indexPrice', event_time='ts'),
+    AdapterSpec("MEXC", "https://contract.mexc.com/api/v1/contract/ticker",
+                ok=lambda d: bool(d.get('success')), rows=('data',),
+                symbol=listed('symbol', ('USDT', 'USDC', 'USD'), sep='_', inverse=('USD',)),
+                mark='fairPrice', index='indexPrice', event_time='timestamp'),
+    # Huobi rebranded to HTX: same swap_batch_funding_rate API, so it is off by default
+    AdapterSpec("Huobi", "https://api.hbdm.vn/linear-swap-api/v1/swap_batch_funding_rate",
+                mirrors=("https://api.hbdm.com/linear-swap-api/v1/swap_batch_funding_rate",),
+                ok=lambda d: d.get('status') == 'ok', rows=('data',),
+                symbol=listed('contract_code', sep='-'), rate='funding_rate', payload_time=lambda d: d.get('ts')),
+    AdapterSpec("BingX", "https://open-api.bingx.com/openApi/swap/v2/quote/premiumIndex",
+                ok=lambda d: d.get('code') == 0, rows=('data',), symbol=listed('symbol', sep='-'),
+                rate='lastFundingRate', mark='markPrice', index='indexPrice', next_funding='nextFundingTime'),
+    AdapterSpec("Kraken", "https://futures.kraken.com/derivatives/api/v3/tickers",
+                ok=lambda d: d.get('result') == 'success', rows=('tickers',), symbol=_kraken_symbol,
+                scale=1.0, unique=True, payload_time=lambda d: d.get('serverTime')),
+    AdapterSpec("dYdX", "https://indexer.dydx.trade/v4/perpetualMarkets",
+                ok=lambda d: 'markets' in d, rows=lambda d: d['markets'].values(),
+                symbol=listed('ticker', ('USD',), sep='-'), rate='nextFundingRate'),
+    AdapterSpec("BitMEX", "https://www.bitmex.com/api/v1/instrument/active",
+                ok=lambda d: isinstance(d, list), symbol=_bitmex_symbol, event_time='timestamp'),
+    AdapterSpec("Phemex", "https://api.phemex.com/md/v2/ticker/24hr", headers={"Accept": "*/*"},
+                ok=lambda d: 'result' in d, rows=('result',), symbol=listed('symbol'),
+                scale=100 / 100000000, event_time='timestamp'),  # fundingRate is scaled by 1e8
+    AdapterSpec("HTX", "https://api.hbdm.com/linear-swap-api/v1/swap_batch_funding_rate",
+                mirrors=("https://api.hbdm.vn/linear-swap-api/v1/swap_batch_funding_rate",),
+                ok=lambda d: d.get('status') == 'ok', rows=('data',),
+                symbol=listed('contract_code', sep='-'), rate='funding_rate', payload_time=lambda d: d.get('ts')),
+    AdapterSpec("CryptoCom", "https://deriv-api.crypto.com/v1/public/get-valuations?valuation_type=funding_rate",
+                mode='browser', ok=lambda d: d.get('code') == 0, rows=('result', 'data'),
+                symbol=listed('i', ('USD',), strip='-PERP'), rate='v', event_time='t'),
+    AdapterSpec("Coinbase", "https://api.international.coinbase.com/api/v1/instruments", mode='browser',
+                ok=lambda d: 'results' in d, rows=('results',),
+                symbol=lambda i: (i['symbol'][:-5], 'USDC', 'linear') if i.get('type') == 'PERPETUAL' and i.get('symbol', '').endswith('-PERP') else None,
+                rate='funding_rate'),
+    AdapterSpec("Hyperliquid", "https://api.hyperliquid.xyz/info", method='POST', body={"type": "metaAndAssetCtxs"},
+                ok=_hyperliquid_ok, rows=_hyperliquid_rows,
+                symbol=lambda i: (i['name'], 'USDC', 'linear') if i['name'] else None, rate='funding',
+                mark='markPx', index='oraclePx', next_funding=_next_hour),
+    AdapterSpec("CoinEx", "https://api.coinex.com/perpetual/v1/market/ticker/all",
+                ok=lambda d: d.get('code') == 0,
+                rows=lambda d: ({'symbol': k, **v} for k, v in d['data']['ticker'].items()),
+                symbol=listed('symbol', ('USDT', 'USDC')),
+                rate=lambda i: i.get('funding_rate_next') or i.get('funding_rate_last'),
+                payload_time=lambda d: d['data'].get('date')),
+    AdapterSpec("BitUnix", "https://fapi.bitunix.com/api/v1/futures/market/funding_rate/batch",
+                fallback_urls=("https://fapi.bitunix.com/api/v1/futures/market/tickers",),
+                ok=lambda d: d.get('code') == 0, rows=('data',), symbol=listed('symbol'), scale=1.0),
+):
+    register(_spec)
+
+# Registered but only fetched when listed explicitly in EXCHANGES
+OFF_BY_DEFAULT = {"Huobi"}
+
+
+def load_plugins(modules: Iterable[str]):
+    """Import custom venue modules; each calls register() or exposes an ADAPTERS list."""
+    for module_name in modules:
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError as e:
+            logger.error(f"Exchange plugin '{module_name}' failed to load: {e}")
+            continue
+        for spec in getattr(module, "ADAPTERS", ()):
+            register(spec)
+
+def env_list(name: str) -> List[str]:
+    return [v.strip() for v in os.getenv(name, "").split(",") if v.strip()]
+
+def default_exchanges() -> List[str]:
+    return [n for n in REGISTRY if n not in OFF_BY_DEFAULT]
+
+def select_adapters(names: Optional[Iterable[str]] = None, plugins: Optional[Iterable[str]] = None) -> List[AdapterSpec]:
+    # EXCHANGES=Binance,Bybit,... (case-insensitive); default: every registered venue not in OFF_BY_DEFAULT.
+    # Either argument left as None falls back to its env variable (EXCHANGES / EXCHANGE_PLUGINS).
+    load_plugins(plugins if plugins is not None else env_list("EXCHANGE_PLUGINS"))
+    if names is None:
+        names = env_list("EXCHANGES") or default_exchanges()
+    by_lower = {name.lower(): spec for name, spec in REGISTRY.items()}
+    selected = []
+    for name in names:
+        spec = by_lower.get(name.lower())
+        if spec is None:
+            logger.warning(f"Unknown exchange '{name}' (known: {', '.join(REGISTRY)})")
+            continue
+        selected.append(spec)
+    return selected
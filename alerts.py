@@ -0,0 +1,138 @@
+import os
+import logging
+from typing import Dict, List, Optional
+from models import Opportunity
+
+logger = logging.getLogger("Alerts")
+logger.setLevel(logging.INFO)
+
+
+class AlertEvent:
+    __slots__ = ("kind", "opportunity", "previous_spread")
+
+    def __init__(self, kind: str, opportunity: Opportunity, previous_spread: Optional[float] = None):
+        self.kind = kind  # 'new' | 'widened'
+        self.opportunity = opportunity
+        self.previous_spread = previous_spread
+
+
+class SymbolState:
+    __slots__ = ("armed", "alert_spread", "alert_time", "opp")
+
+    def __init__(self):
+        self.armed = False
+        self.alert_spread = 0.0
+        self.alert_time = float("-inf")
+        self.opp: Optional[Opportunity] = None  # last crossing seen while deferred; retried until sent
+
+
+class AlertEngine:
+    """Fires when a symbol's spread crosses ALERT_SPREAD or widens by ALERT_WIDEN_STEP.
+
+    A symbol re-arms only after falling below ALERT_SPREAD - ALERT_HYSTERESIS, and never
+    alerts twice within ALERT_COOLDOWN seconds. Per cycle, only the symbols in `changes` (those
+    whose legs moved beyond CHANGE_TOLERANCE, see SpreadBook.changes) plus deferred and held ones
+    go through the state machine, so a cycle costs O(changed) rather than O(all symbols).
+
+    `spreads` gives every symbol's spread, including those below MIN_SPREAD or flagged stale, so a
+    symbol missing from the opportunities only disarms once it really falls out of the band.
+    """
+
+    def __init__(self, threshold: Optional[float] = None):
+        self.threshold = threshold if threshold is not None else float(os.getenv("ALERT_SPREAD", os.getenv("MIN_SPREAD", 0.025)))
+        self.hysteresis = float(os.getenv("ALERT_HYSTERESIS", 0.01))
+        self.widen_step = float(os.getenv("ALERT_WIDEN_STEP", 0.05))
+        self.cooldown = float(os.getenv("ALERT_COOLDOWN", 300))
+        min_spread = float(os.getenv("MIN_SPREAD", 0.025))
+        if threshold is None and self.threshold < min_spread:
+            logger.warning(f"ALERT_SPREAD {self.threshold} is below MIN_SPREAD {min_spread}: "
+                           f"alerts effectively fire from MIN_SPREAD")
+
+        self.state: Dict[str, SymbolState] = {}
+        self.deferred = set()  # crossed while cooling down; retried every cycle until sent or gone
+        self.held = set()      # armed but not alertable this cycle (below MIN_SPREAD / stale); re-checked
+
+    def evaluate(self, changes: Dict[str, Optional[Opportunity]], now: float,
+                 spreads: Optional[Dict[str, float]] = None) -> List[AlertEvent]:
+        # changes: symbol -> its alertable opportunity, or None (below MIN_SPREAD / stale / gone);
+        # symbols not in it are taken as unchanged since the previous call
+        events = []
+        for sym in changes.keys() | self.deferred | self.held:
+            if sym in changes:
+                opp = changes[sym]
+            elif sym in self.deferred and sym in self.state:
+                opp = self.state[sym].opp
+            else:
+                opp = None
+            if opp is None:
+                self._hold(sym, spreads.get(sym) if spreads else None, now)
+                continue
+            event = self._step(sym, opp, now)
+            if event: events.append(event)
+        events.sort(key=lambda e: e.opportunity.spread, reverse=True)
+        return events
+
+    def _hold(self, sym: str, spread: Optional[float], now: float):
+        # Not alertable this cycle: only the disarm side of the state machine applies
+        self.deferred.discard(sym)
+        self.held.discard(sym)
+        state = self.state.get(sym)
+        if state is None: return
+        if state.armed:
+            if spread is None or spread < self.threshold - self.hysteresis:
+                state.armed = False
+            else:
+                self.held.add(sym)
+        elif now - state.alert_time >= self.cooldown:
+            del self.state[sym]
+
+    def _step(self, sym: str, opp: Optional[Opportunity], now: float) -> Optional[AlertEvent]:
+        self.deferred.discard(sym)
+        self.held.discard(sym)
+        state = self.state.get(sym)
+        spread = opp.spread if opp else None
+
+        if state and state.armed:
+            if spread is None or spread < self.threshold - self.hysteresis:
+                state.armed = False
+                return None
+            if spread < state.alert_spread + self.widen_step: return None
+            kind = "widened"
+        else:
+            if spread is None or spread < self.threshold:
+                # Forget fully settled symbols so memory tracks only live ones
+                if state and now - state.alert_time >= self.cooldown: del self.state[sym]
+                return None
+            kind = "new"
+
+        if state is None:
+            state = self.state[sym] = SymbolState()
+        if now - state.alert_time < self.cooldown:
+            state.opp = opp
+            self.deferred.add(sym)
+            return None
+
+        previous = state.alert_spread if kind == "widened" else None
+        state.armed = True
+        state.alert_spread = spread
+        state.alert_time = now
+        state.opp = None
+        return AlertEvent(kind, opp, previous)
+
+    # Plain-data state for warm restarts (see snapshot.py); alert times are wall-clock
+    def export_state(self) -> dict:
+        return {
+            "state": {sym: (s.armed, s.alert_spread, s.alert_time) for sym, s in self.state.items()},
+            "deferred": list(self.deferred),
+            "held": list(self.held),
+        }
+
+    def load_state(self, data: dict):
+        self.state = {}
+        for sym, (armed, alert_spread, alert_time) in data.get("state", {}).items():
+            state = self.state[sym] = SymbolState()
+            state.armed, state.alert_spread, state.alert_time = armed, alert_spread, alert_time
+        # Restored deferred symbols carry no opportunity; the first cycle after a restart reports
+        # every symbol as changed, which re-triggers them
+        self.deferred = set(data.get("deferred", ()))
+        self.held = set(data.get("held", ()))
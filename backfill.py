@@ -0,0 +1,413 @@
+"""Historical funding-rate backfill into a local Parquet store.
+
+    python backfill.py --days 90 --out data/funding
+    python backfill.py --venues Binance,OKX --symbols BTCUSDT,ETHUSDT --since 2024-01-01
+    python backfill.py --record fixtures/ ...   # save every HTTP response
+    python backfill.py --fixtures fixtures/ ... # replay them offline (no network)
+
+Re-running the same command resumes from the checkpoint in <out>/_checkpoint.json.
+Requires pyarrow (pip install pyarrow).
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from fetcher import AsyncFetcher
+from adapters import REGISTRY, select_adapters
+from instruments import parse_code
+from ratelimit import AsyncRateLimiter
+
+logger = logging.getLogger("Backfill")
+logger.setLevel(logging.INFO)
+
+
+@dataclass(frozen=True)
+class HistorySpec:
+    """How to page one venue's funding-rate history endpoint.
+
+    `request(native_symbol, cursor, start_ms, end_ms)` returns (url, post_body or None).
+    `rows(payload)` yields (funding_time_ms, raw_rate). Paging is 'forward' (cursor = next start
+    time, endpoint returns oldest first), 'backward' (cursor = end time, newest first) or
+    'page' (cursor = page number, newest first).
+    """
+    name: str
+    request: Callable[[str, int, int, int], Tuple[str, Optional[dict]]]
+    rows: Callable[[Any], Iterable[Tuple[int, Any]]]
+    direction: str
+    page_size: int
+    rate_limit: float                  # requests per second
+    native: Callable[[str], str] = lambda s: s
+    scale: float = 100.0
+    method: str = "GET"
+
+
+def _iso(ms: int) -> str:
+    return datetime.fromtimestamp(ms / 1000, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+def _parse_iso(s: str) -> int:
+    return int(datetime.fromisoformat(s.replace("Z", "+00:00")).timestamp() * 1000)
+
+def _bitmex_native(sym: str) -> str:
+    # BTCUSD-INV -> XBTUSD, BTCUSDT -> XBTUSDT
+    inst = parse_code(sym)
+    return ("XBT" if inst.base == "BTC" else inst.base) + inst.quote
+
+def _kucoin_native(sym: str) -> str:
+    # BTCUSDT -> XBTUSDTM
+    inst = parse_code(sym)
+    return ("XBT" if inst.base == "BTC" else inst.base) + inst.quote + "M"
+
+def _bybit_native(sym: str) -> str:
+    # USDC perps are listed natively as <base>PERP: BTCUSDC -> BTCPERP
+    inst = parse_code(sym)
+    return inst.base + ("PERP" if inst.quote == "USDC" else inst.quote)
+
+def _gateio_request(sym: str, cur: int, start: int, end: int) -> Tuple[str, Optional[dict]]:
+    # Each settle currency has its own path: BTC_USDT -> /futures/usdt, BTC_USDC -> /futures/usdc
+    settle = sym.rsplit("_", 1)[-1].lower()
+    return f"https://api.gateio.ws/api/v4/futures/{settle}/funding_rate?contract={sym}&from={start // 1000}&to={cur // 1000}&limit=1000", None
+
+def _kraken_native(sym: str) -> str:
+    # BTCUSD -> PF_XBTUSD (multi-collateral linear), BTCUSD-INV -> PI_XBTUSD
+    inst = parse_code(sym)
+    return ("PI_" if inst.margin == "inverse" else "PF_") + ("XBT" if inst.base == "BTC" else inst.base) + inst.quote
+
+
+HISTORY: Dict[str, HistorySpec] = {s.name: s for s in (
+    HistorySpec(
+        "Binance", direction="forward", page_size=1000, rate_limit=2,
+        request=lambda sym, cur, start, end: (f"https://fapi.binance.com/fapi/v1/fundingRate?symbol={sym}&startTime={cur}&endTime={end}&limit=1000", None),
+        rows=lambda d: ((int(i["fundingTime"]), i["fundingRate"]) for i in d)),
+    HistorySpec(
+        "Bybit", direction="backward", page_size=200, rate_limit=10, native=_bybit_native,
+        request=lambda sym, cur, start, end: (f"https://api.bybit.com/v5/market/funding/history?category=linear&symbol={sym}&startTime={start}&endTime={cur}&limit=200", None),
+        rows=lambda d: ((int(i["fundingRateTimestamp"]), i["fundingRate"]) for i in d["result"]["list"])),
+    HistorySpec(
+        "OKX", direction="backward", page_size=100, rate_limit=5,
+        native=lambda s: "{0}-{1}-SWAP".format(*parse_code(s)),
+        request=lambda sym, cur, start, end: (f"https://www.okx.com/api/v5/public/funding-rate-history?instId={sym}&after={cur + 1}&limit=100", None),
+        rows=lambda d: ((int(i["fundingTime"]), i.get("realizedRate") or i["fundingRate"]) for i in d["data"])),
+    HistorySpec(
+        "Bitget", direction="page", page_size=100, rate_limit=10,
+        request=lambda sym, cur, start, end: (f"https://api.bitget.com/api/v2/mix/market/history-fund-rate?symbol={sym}&productType=usdt-futures&pageSize=100&pageNo={cur}", None),
+        rows=lambda d: ((int(i["fundingTime"]), i["fundingRate"]) for i in d["data"])),
+    HistorySpec(
+        "Hyperliquid", direction="forward", page_size=500, rate_limit=5, method="POST",
+        native=lambda s: parse_code(s).base,
+        request=lambda sym, cur, start, end: ("https://api.hyperliquid.xyz/info", {"type": "fundingHistory", "coin": sym, "startTime": cur, "endTime": end}),
+        rows=lambda d: ((int(i["time"]), i["fundingRate"]) for i in d)),
+    HistorySpec(
+        "BitMEX", direction="forward", page_size=500, rate_limit=1, native=_bitmex_native,
+        request=lambda sym, cur, start, end: (f"https://www.bitmex.com/api/v1/funding?symbol={sym}&startTime={_iso(cur)}&endTime={_iso(end)}&count=500&reverse=false", None),
+        rows=lambda d: ((_parse_iso(i["timestamp"]), i["fundingRate"]) for i in d)),
+    HistorySpec(
+        "GateIO", direction="backward", page_size=1000, rate_limit=10,
+        native=lambda s: "{0}_{1}".format(*parse_code(s)), request=_gateio_request,
+        rows=lambda d: ((int(i["t"]) * 1000, i["r"]) for i in d)),
+    HistorySpec(
+        "KuCoin", direction="backward", page_size=100, rate_limit=5, native=_kucoin_native,
+        request=lambda sym, cur, start, end: (f"https://api-futures.kucoin.com/api/v1/contract/funding-rates?symbol={sym}&from={start}&to={cur}", None),
+        rows=lambda d: ((int(i["timepoint"]), i["fundingRate"]) for i in d["data"])),
+    HistorySpec(
+        "MEXC", direction="page", page_size=100, rate_limit=5,
+        native=lambda s: "{0}_{1}".format(*parse_code(s)),
+        request=lambda sym, cur, start, end: (f"https://contract.mexc.com/api/v1/contract/funding_rate/history?symbol={sym}&page_num={cur}&page_size=100", None),
+        rows=lambda d: ((int(i["settleTime"]), i["fundingRate"]) for i in d["data"]["resultList"])),
+    HistorySpec(
+        "HTX", direction="page", page_size=50, rate_limit=5,
+        native=lambda s: "{0}-{1}".format(*parse_code(s)),
+        request=lambda sym, cur, start, end: (f"https://api.hbdm.com/linear-swap-api/v1/swap_historical_funding_rate?contract_code={sym}&page_index={cur}&page_size=50", None),
+        rows=lambda d: ((int(i["funding_time"]), i.get("realized_rate") or i["funding_rate"]) for i in d["data"]["data"])),
+    HistorySpec(
+        "BingX", direction="backward", page_size=1000, rate_limit=5,
+        native=lambda s: "{0}-{1}".format(*parse_code(s)),
+        request=lambda sym, cur, start, end: (f"https://open-api.bingx.com/openApi/swap/v2/quote/fundingRate?symbol={sym}&startTime={start}&endTime={cur}&limit=1000", None),
+        rows=lambda d: ((int(i["fundingTime"]), i["fundingRate"]) for i in d["data"])),
+    HistorySpec(
+        # Hourly funding; BTCUSDT / BTCUSD both map to the BTC-USD market
+        "dYdX", direction="backward", page_size=100, rate_limit=5,
+        native=lambda s: f"{parse_code(s).base}-USD",
+        request=lambda sym, cur, start, end: (f"https://indexer.dydx.trade/v4/historicalFunding/{sym}?effectiveBeforeOrAt={_iso(cur)}&limit=100", None),
+        rows=lambda d: ((_parse_iso(i["effectiveAt"]), i["rate"]) for i in d["historicalFunding"])),
+    HistorySpec(
+        # Whole history in one response, oldest first; relativeFundingRate is the hourly rate
+        "Kraken", direction="forward", page_size=1_000_000, rate_limit=2, native=_kraken_native,
+        request=lambda sym, cur, start, end: (f"https://futures.kraken.com/derivatives/api/v4/historicalfundingrates?symbol={sym}", None),
+        rows=lambda d: ((_parse_iso(i["timestamp"]), i["relativeFundingRate"]) for i in d["rates"])),
+    HistorySpec(
+        # Rates live under the funding-rate symbol, e.g. .BTCUSDTFR8H
+        "Phemex", direction="backward", page_size=100, rate_limit=2,
+        native=lambda s: ".{0}{1}FR8H".format(*parse_code(s)),
+        request=lambda sym, cur, start, end: (f"https://api.phemex.com/api-data/public/data/funding-rate-history?symbol={sym}&start={start}&end={cur}&limit=100", None),
+        rows=lambda d: ((int(i["fundingTime"]), i["fundingRate"]) for i in d["data"]["rows"])),
+    HistorySpec(
+        "CryptoCom", direction="backward", page_size=300, rate_limit=5,
+        native=lambda s: f"{parse_code(s).base}USD-PERP",
+        request=lambda sym, cur, start, end: (f"https://deriv-api.crypto.com/v1/public/get-valuations?instrument_name={sym}&valuation_type=funding_hist&count=300&start_ts={start}&end_ts={cur}", None),
+        rows=lambda d: ((int(i["t"]), i["v"]) for i in d["result"]["data"])),
+    HistorySpec(
+        # Coinbase International; offset paging, newest first
+        "Coinbase", direction="page", page_size=100, rate_limit=5,
+        native=lambda s: f"{parse_code(s).base}-PERP",
+        request=lambda sym, cur, start, end: (f"https://api.international.coinbase.com/api/v1/instruments/{sym}/funding?result_limit=100&result_offset={(cur - 1) * 100}", None),
+        rows=lambda d: ((_parse_iso(i["event_time"]), i["funding_rate"]) for i in d["results"])),
+    HistorySpec(
+        "CoinEx", direction="page", page_size=100, rate_limit=5,
+        request=lambda sym, cur, start, end: (f"https://api.coinex.com/v2/futures/funding-rate-history?market={sym}&start_time={start}&end_time={end}&page={cur}&limit=100", None),
+        rows=lambda d: ((int(i["funding_time"]), i["actual_funding_rate"]) for i in d["data"])),
+)}
+# No public funding history wired up yet: Huobi (use HTX), BitUnix
+
+
+class FixtureFetcher(AsyncFetcher):
+    """Records every response to, or replays them from, `<dir>/<sha1 of request>.json`."""
+
+    def __init__(self, user_agent: str, directory: str, replay: bool):
+        super().__init__(user_agent, exchanges=[])
+        self.directory = directory
+        self.replay = replay
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str, method: str, post_data: Optional[dict]) -> str:
+        key = f"{method} {url} {json.dumps(post_data, sort_keys=True) if post_data else ''}"
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+    async def _fetch(self, url: str, mode: str = 'std', extra_headers: dict = None, method: str = 'GET', post_data: dict = None,
+                     exchange: str = "") -> Any:
+        path = self._path(url, method, post_data)
+        if self.replay:
+            if not os.path.exists(path): return None
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)["response"]
+        data = await super()._fetch(url, mode, extra_headers, method, post_data, exchange)
+        if data is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"method": method, "url": url, "body": post_data, "response": data}, f)
+        return data
+
+
+class ParquetStore:
+    """Buffers rows per venue and writes them as Hive-partitioned Parquet files (venue=<name>/part-*.parquet)."""
+
+    def __init__(self, root: str):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            sys.exit("backfill needs pyarrow: pip install pyarrow")
+        self.pa, self.pq = pyarrow, pyarrow.parquet
+        self.root = root
+        self.buffers: Dict[str, Tuple[list, list, list]] = {}
+        self.rows = 0
+        self.parts = 0
+
+    def add(self, venue: str, symbol: str, rows: List[Tuple[int, float]]):
+        syms, times, rates = self.buffers.setdefault(venue, ([], [], []))
+        syms.extend([symbol] * len(rows))
+        times.extend(t for t, _ in rows)
+        rates.extend(r for _, r in rows)
+        self.rows += len(rows)
+
+    def take(self) -> Dict[str, Tuple[list, list, list]]:
+        buffers, self.buffers, self.rows = self.buffers, {}, 0
+        return buffers
+
+    def write(self, buffers: Dict[str, Tuple[list, list, list]]) -> int:
+        pa, written = self.pa, 0
+        for venue, (syms, times, rates) in buffers.items():
+            table = pa.table({
+                "symbol": pa.array(syms, pa.string()).dictionary_encode(),
+                "funding_time": pa.array(times, pa.timestamp("ms", tz="UTC")),
+                "rate": pa.array(rates, pa.float64()),
+            })
+            directory = os.path.join(self.root, f"venue={venue}")
+            os.makedirs(directory, exist_ok=True)
+            self.parts += 1
+            self.pq.write_table(table, os.path.join(directory, f"part-{int(time.time() * 1000)}-{self.parts:05d}.parquet"),
+                                compression="zstd")
+            written += len(syms)
+        return written
+
+
+class Checkpoint:
+    def __init__(self, path: str, start_ms: int, end_ms: int, restart: bool):
+        self.path = path
+        self.jobs: Dict[str, dict] = {}
+        if os.path.exists(path) and not restart:
+            with open(path, encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("range") != [start_ms, end_ms]:
+                sys.exit(f"{path} belongs to another time range; pass the same --since/--until or --restart")
+            self.jobs = saved["jobs"]
+        self.range = [start_ms, end_ms]
+
+    def save(self, jobs: Dict[str, dict]):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"range": self.range, "jobs": jobs}, f)
+        os.replace(tmp, self.path)
+
+
+class Backfill:
+    def __init__(self, fetcher: AsyncFetcher, store: ParquetStore, checkpoint: Checkpoint,
+                 start_ms: int, end_ms: int, concurrency: int, flush_rows: int):
+        self.fetcher = fetcher
+        self.store = store
+        self.checkpoint = checkpoint
+        self.start_ms, self.end_ms = start_ms, end_ms
+        self.flush_rows = flush_rows
+        self.slots = asyncio.Semaphore(concurrency)
+        self.limiters = {name: AsyncRateLimiter(spec.rate_limit) for name, spec in HISTORY.items()}
+        self.jobs = checkpoint.jobs
+        self._flush_lock = asyncio.Lock()
+        self.requests = 0
+        self.written = 0
+
+    async def run(self, work: List[Tuple[str, str]]):
+        pending = [(v, s) for v, s in work if not self.jobs.get(f"{v}:{s}", {}).get("done")]
+        logger.info(f"{len(work) - len(pending)} of {len(work)} jobs already complete, {len(pending)} to go")
+        await asyncio.gather(*(self._job(HISTORY[v], s) for v, s in pending))
+
+    async def flush(self):
+        async with self._flush_lock:
+            # Rows and cursors are captured together, so the checkpoint never claims unwritten rows
+            buffers = self.store.take()
+            jobs = json.loads(json.dumps(self.jobs))
+            self.written += await asyncio.to_thread(self.store.write, buffers)
+            await asyncio.to_thread(self.checkpoint.save, jobs)
+
+    async def _job(self, spec: HistorySpec, symbol: str):
+        key = f"{spec.name}:{symbol}"
+        state = self.jobs.setdefault(key, {"cursor": self._initial_cursor(spec), "done": False})
+        native = spec.native(symbol)
+        while not state["done"]:
+            url, body = spec.request(native, state["cursor"], self.start_ms, self.end_ms)
+            data = await self._request(spec, url, body)
+            if data is None:
+                logger.warning(f"{key}: giving up at cursor {state['cursor']}, will resume on next run")
+                return
+            try:
+                page = [(t, float(r) * spec.scale) for t, r in spec.rows(data) if r not in (None, "")]
+            except (KeyError, TypeError, ValueError, AttributeError) as e:
+                # An error payload (unknown symbol, wrong path) is not an empty history: leave the job open
+                logger.warning(f"{key}: unexpected response for {native} ({type(e).__name__}: {e}), will retry on next run")
+                return
+            rows = [(t, r) for t, r in page if self.start_ms <= t <= self.end_ms]
+            if rows: self.store.add(spec.name, symbol, rows)
+            state["rows"] = state.get("rows", 0) + len(rows)
+            state["cursor"], state["done"] = self._advance(spec, state["cursor"], page)
+            if self.store.rows >= self.flush_rows:
+                await self.flush()
+        if not state.get("rows"):
+            logger.warning(f"{key}: no funding history in range for {native}")
+
+    def _initial_cursor(self, spec: HistorySpec) -> int:
+        return {"forward": self.start_ms, "backward": self.end_ms, "page": 1}[spec.direction]
+
+    def _advance(self, spec: HistorySpec, cursor: int, page: List[Tuple[int, float]]) -> Tuple[int, bool]:
+        if not page: return cursor, True
+        times = [t for t, _ in page]
+        short = len(page) < spec.page_size
+        if spec.direction == "forward":
+            nxt = max(times) + 1
+            return nxt, short or nxt > self.end_ms or nxt <= cursor
+        oldest = min(times)
+        if spec.direction == "backward":
+            nxt = oldest - 1
+            return nxt, short or nxt < self.start_ms or nxt >= cursor
+        return cursor + 1, short or oldest < self.start_ms
+
+    async def _request(self, spec: HistorySpec, url: str, body: Optional[dict]) -> Any:
+        for attempt in range(4):
+            async with self.slots:
+                await self.limiters[spec.name].acquire()
+                self.requests += 1
+                data = await self.fetcher._fetch(url, mode='browser', method=spec.method, post_data=body)
+            if data is not None: return data
+            await asyncio.sleep(2 ** attempt)
+        return None
+
+
+async def discover_symbols(fetcher: AsyncFetcher, venues: List[str]) -> Dict[str, List[str]]:
+    # One live snapshot per venue gives the symbols it currently lists (recorded/replayed like any request)
+    fetcher.adapters = [REGISTRY[v] for v in venues]
+    symbols = {}
+    async for name, rates in fetcher.iter_all():
+        symbols[name] = sorted({r.symbol for r in rates if r.symbol.endswith(("USDT", "USDC", "USD", "USD-INV"))})
+    return symbols
+
+
+def _parse_day(s: str) -> int:
+    return int(datetime.strptime(s, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+async def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Backfill historical funding rates into a local Parquet store")
+    parser.add_argument("--venues", help="comma-separated venues (default: EXCHANGES config)")
+    parser.add_argument("--symbols", help="comma-separated normalized symbols, e.g. BTCUSDT (default: everything listed live)")
+    parser.add_argument("--since", help="start date YYYY-MM-DD (default: --days ago)")
+    parser.add_argument("--until", help="end date YYYY-MM-DD (default: today 00:00 UTC)")
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--out", default="data/funding")
+    parser.add_argument("--concurrency", type=int, default=32, help="max in-flight requests across venues")
+    parser.add_argument("--flush-rows", type=int, default=200_000)
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    fixtures = parser.add_mutually_exclusive_group()
+    fixtures.add_argument("--record", metavar="DIR", help="save HTTP responses as fixtures")
+    fixtures.add_argument("--fixtures", metavar="DIR", help="replay recorded fixtures instead of the network")
+    args = parser.parse_args(argv)
+
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    end_ms = _parse_day(args.until) if args.until else int(today.timestamp() * 1000)
+    start_ms = _parse_day(args.since) if args.since else int((today - timedelta(days=args.days)).timestamp() * 1000)
+
+    configured = [s.name for s in select_adapters(args.venues.split(",") if args.venues else None)]
+    venues = [v for v in configured if v in HISTORY]
+    for v in configured:
+        if v not in HISTORY: logger.warning(f"{v}: no history endpoint defined, skipped")
+
+    if args.fixtures or args.record:
+        fetcher = FixtureFetcher("", args.fixtures or args.record, replay=bool(args.fixtures))
+    else:
+        fetcher = AsyncFetcher("", exchanges=[])
+    await fetcher.start_session()
+    try:
+        if args.symbols:
+            wanted = [s.strip().upper() for s in args.symbols.split(",") if s.strip()]
+            work = [(v, s) for v in venues for s in wanted]
+        else:
+            listed = await discover_symbols(fetcher, venues)
+            work = [(v, s) for v in venues for s in listed.get(v, [])]
+
+        os.makedirs(args.out, exist_ok=True)
+        store = ParquetStore(args.out)
+        checkpoint = Checkpoint(os.path.join(args.out, "_checkpoint.json"), start_ms, end_ms, args.restart)
+        job = Backfill(fetcher, store, checkpoint, start_ms, end_ms, args.concurrency, args.flush_rows)
+
+        started = time.perf_counter()
+        try:
+            await job.run(work)
+        finally:
+            # Interrupted runs still persist what they have so the next run resumes from there
+            await job.flush()
+        logger.info(f"Backfilled {job.written} rows from {job.requests} requests in {time.perf_counter() - started:.1f}s")
+    finally:
+        await fetcher.close()
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,250 @@
+"""Raw-payload capture log: every venue response, compressed in chunks, replayable offline.
+
+    CAPTURE_PATH=/tmp/athena.capture python main.py         # record while running
+    python capture.py /tmp/athena.capture --exchange Phemex  # summarize / inspect
+    python capture.py /tmp/athena.capture --rates            # re-run the adapters on the raw bytes
+
+Log layout: MAGIC, then chunks of CHUNK_HEAD (codec, compressed size, record count) + compressed
+records. Each record is RECORD_HEAD (timestamp, latency, name/url/payload sizes) + those bytes.
+`<path>.idx` holds one INDEX_REC (offset, size, count, first/last timestamp) per chunk, so a reader
+can skip to a time range without decompressing anything before it. Past CAPTURE_MAX_BYTES the log
+rotates to `<path>.1` (+ `<path>.1.idx`) ... `<path>.<CAPTURE_BACKUPS>`, each readable on its own.
+"""
+import os
+import sys
+import json
+import time
+import zlib
+import queue
+import struct
+import logging
+import argparse
+import threading
+from typing import Iterator, List, NamedTuple, Optional, Set, Tuple
+
+try:
+    import zstandard
+except ImportError:  # zlib fallback; zstd chunks then need zstandard to read
+    zstandard = None
+
+logger = logging.getLogger("Capture")
+logger.setLevel(logging.INFO)
+
+MAGIC = b"ATHCAP01"
+CODEC_ZLIB, CODEC_ZSTD = 0, 1
+CHUNK_HEAD = struct.Struct("!BII")       # codec, compressed size, record count
+RECORD_HEAD = struct.Struct("!dfHHI")    # timestamp, latency, exchange len, url len, payload len
+INDEX_REC = struct.Struct("!QIIdd")      # chunk offset, compressed size, count, first ts, last ts
+
+
+class CaptureRecord(NamedTuple):
+    exchange: str
+    url: str
+    timestamp: float
+    latency: float
+    raw: bytes
+
+
+def _compress(data: bytes) -> Tuple[int, bytes]:
+    if zstandard is not None:
+        return CODEC_ZSTD, zstandard.ZstdCompressor(level=3).compress(data)
+    return CODEC_ZLIB, zlib.compress(data, 6)
+
+def _decompress(codec: int, data: bytes) -> bytes:
+    if codec == CODEC_ZSTD:
+        if zstandard is None: raise RuntimeError("capture chunk is zstd-compressed: pip install zstandard")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+class CaptureLog:
+    """Appends raw responses to a chunked, compressed log from a background thread.
+
+    `record()` only enqueues, so the event loop never waits on compression or disk. The writer
+    thread seals a chunk every CAPTURE_CHUNK records or CAPTURE_FLUSH seconds, whichever comes first.
+    At most CAPTURE_QUEUE responses wait for the writer; beyond that they are dropped and counted
+    in `dropped`, so a stalled disk cannot grow memory without bound.
+    """
+
+    def __init__(self, path: str, chunk_records: Optional[int] = None, flush_interval: Optional[float] = None):
+        self.path = path
+        self.chunk_records = chunk_records or int(os.getenv("CAPTURE_CHUNK", 256))
+        self.flush_interval = flush_interval or float(os.getenv("CAPTURE_FLUSH", 5))
+        self.max_bytes = int(os.getenv("CAPTURE_MAX_BYTES", 1024 * 1024 * 1024))
+        self.backups = int(os.getenv("CAPTURE_BACKUPS", 3))
+        self.records = self.chunks = self.bytes_in = self.bytes_out = self.dropped = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=int(os.getenv("CAPTURE_QUEUE", 1024)))
+        if zstandard is None:
+            logger.warning("zstandard not installed: capture falls back to zlib (larger, slower logs)")
+        self._thread = threading.Thread(target=self._run, name="capture-writer", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def from_env(cls) -> Optional["CaptureLog"]:
+        path = os.getenv("CAPTURE_PATH", "")
+        return cls(path) if path else None
+
+    def record(self, exchange: str, url: str, timestamp: float, latency: float, raw: bytes):
+        try:
+            self._queue.put_nowait((exchange, url, timestamp, latency, raw))
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped & (self.dropped - 1) == 0:  # 1, 2, 4, 8... keeps the log readable
+                logger.warning(f"Capture writer behind, {self.dropped} responses dropped so far")
+
+    def close(self):
+        """Flush pending records and stop the writer (blocking; call via asyncio.to_thread on the loop)."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _open(self):
+        log, idx = open(self.path, "ab"), open(self.path + ".idx", "ab")
+        if log.tell() == 0: log.write(MAGIC)
+        return log, idx
+
+    def _run(self):
+        batch: List[tuple] = []
+        deadline = None
+        log, idx = self._open()
+        try:
+            while True:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = ()
+                if item:
+                    if not batch: deadline = time.monotonic() + self.flush_interval
+                    batch.append(item)
+                if batch and (item is None or item == () or len(batch) >= self.chunk_records):
+                    try:
+                        if 0 < self.max_bytes <= log.tell():
+                            log.close()
+                            idx.close()
+                            self._rotate()
+                            log, idx = self._open()
+                        self._write_chunk(log, idx, batch)
+                    except OSError as e:
+                        logger.error(f"Capture write failed, dropping {len(batch)} records: {e}")
+                    batch, deadline = [], None
+                if item is None: return
+        finally:
+            log.close()
+            idx.close()
+
+    def _rotate(self):
+        # Same scheme as the tracer: <path>.1 is the newest backup, each with its own index
+        for i in range(self.backups - 1, 0, -1):
+            for ext in ("", ".idx"):
+                src = f"{self.path}.{i}{ext}"
+                if os.path.exists(src): os.replace(src, f"{self.path}.{i + 1}{ext}")
+        for ext in ("", ".idx"):
+            if self.backups > 0:
+                os.replace(self.path + ext, f"{self.path}.1{ext}")
+            else:
+                os.remove(self.path + ext)
+
+    def _write_chunk(self, log, idx, batch: List[tuple]):
+        parts = []
+        for exchange, url, ts, latency, raw in batch:
+            name, link = exchange.encode(), url.encode()
+            parts.append(RECORD_HEAD.pack(ts, latency, len(name), len(link), len(raw)))
+            parts += (name, link, raw)
+        plain = b"".join(parts)
+        codec, packed = _compress(plain)
+        offset = log.tell()
+        log.write(CHUNK_HEAD.pack(codec, len(packed), len(batch)) + packed)
+        log.flush()
+        idx.write(INDEX_REC.pack(offset, len(packed), len(batch), batch[0][2], batch[-1][2]))
+        idx.flush()
+        self.records += len(batch)
+        self.chunks += 1
+        self.bytes_in += len(plain)
+        self.bytes_out += len(packed)
+
+
+def _chunks(path: str, start: Optional[float], end: Optional[float]) -> Iterator[Tuple[int, bytes, int]]:
+    """(codec, compressed payload, count) per chunk, using the index to skip chunks outside [start, end]."""
+    entries = None
+    try:
+        with open(path + ".idx", "rb") as f:
+            blob = f.read()
+        entries = [INDEX_REC.unpack_from(blob, i) for i in range(0, len(blob) - INDEX_REC.size + 1, INDEX_REC.size)]
+    except FileNotFoundError:
+        pass
+    with open(path, "rb") as log:
+        if log.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a capture log")
+        if entries is not None:
+            for offset, size, count, first, last in entries:
+                if (start is not None and last < start) or (end is not None and first > end): continue
+                log.seek(offset)
+                codec, size, count = CHUNK_HEAD.unpack(log.read(CHUNK_HEAD.size))
+                yield codec, log.read(size), count
+            return
+        # No index: walk the chunk headers sequentially
+        while True:
+            head = log.read(CHUNK_HEAD.size)
+            if len(head) < CHUNK_HEAD.size: return
+            codec, size, count = CHUNK_HEAD.unpack(head)
+            payload = log.read(size)
+            if len(payload) < size: return  # torn tail from a crash mid-write
+            yield codec, payload, count
+
+def read_capture(path: str, start: Optional[float] = None, end: Optional[float] = None,
+                 exchanges: Optional[Set[str]] = None) -> Iterator[CaptureRecord]:
+    for codec, payload, count in _chunks(path, start, end):
+        data = _decompress(codec, payload)
+        pos = 0
+        for _ in range(count):
+            ts, latency, n_name, n_url, n_raw = RECORD_HEAD.unpack_from(data, pos)
+            pos += RECORD_HEAD.size
+            name = data[pos:pos + n_name].decode()
+            url = data[pos + n_name:pos + n_name + n_url].decode()
+            raw = data[pos + n_name + n_url:pos + n_name + n_url + n_raw]
+            pos += n_name + n_url + n_raw
+            if start is not None and ts < start: continue
+            if end is not None and ts > end: continue
+            if exchanges is not None and name not in exchanges: continue
+            yield CaptureRecord(name, url, ts, latency, raw)
+
+def replay(path: str, **filters) -> Iterator[Tuple[CaptureRecord, list]]:
+    """Feed captured payloads back through the adapters' parse path, as at capture time."""
+    from adapters import REGISTRY, parse
+    for rec in read_capture(path, **filters):
+        spec = REGISTRY.get(rec.exchange)
+        if spec is None: continue
+        try:
+            data = json.loads(rec.raw)
+        except ValueError:
+            data = None
+        yield rec, parse(spec, data, rec.timestamp)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect or replay a raw-payload capture log")
+    parser.add_argument("path")
+    parser.add_argument("--exchange", help="comma-separated venues to include")
+    parser.add_argument("--from", dest="start", type=float, help="unix seconds")
+    parser.add_argument("--to", dest="end", type=float, help="unix seconds")
+    parser.add_argument("--rates", action="store_true", help="re-parse payloads and print the resulting rates")
+    parser.add_argument("--raw", action="store_true", help="print the raw payloads")
+    args = parser.parse_args(argv)
+    exchanges = {e.strip() for e in args.exchange.split(",") if e.strip()} if args.exchange else None
+    filters = dict(start=args.start, end=args.end, exchanges=exchanges)
+
+    if args.rates:
+        for rec, rates in replay(args.path, **filters):
+            for r in rates:
+                print(json.dumps({"exchange": r.exchange, "symbol": r.symbol, "rate": r.rate, "timestamp": r.timestamp}))
+        return 0
+    for rec in read_capture(args.path, **filters):
+        if args.raw:
+            sys.stdout.write(rec.raw.decode(errors="replace") + "\n")
+        else:
+            print(f"{rec.timestamp:.3f} {rec.exchange:<12} {rec.latency * 1000:7.1f}ms {len(rec.raw):>9}B {rec.url}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
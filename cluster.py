@@ -0,0 +1,271 @@
+"""Distributed fetching: nodes poll a subset of venues and stream rates to one aggregator.
+
+    # aggregator: the normal bot, with its rates coming from nodes instead of local fetches
+    CLUSTER_SECRET=s3cret CLUSTER_LISTEN=0.0.0.0:7700 python main.py
+    # nodes (any number, any host/region)
+    CLUSTER_SECRET=s3cret python cluster.py --connect 10.0.0.5:7700 --exchanges Binance,Bybit
+    CLUSTER_SECRET=s3cret python cluster.py --connect 10.0.0.5:7700 --exchanges OKX,HTX --id eu-1
+
+Wire format is the feed.py framing plus a 32-byte HMAC-SHA256 trailer on every frame sent by a
+node. On connect the aggregator sends a random challenge; frames are signed with
+HMAC(CLUSTER_SECRET, challenge), so a captured session cannot be replayed into another.
+"""
+import os
+import math
+import hmac
+import struct
+import time
+import socket
+import asyncio
+import hashlib
+import argparse
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from models import FundingRate
+from fetcher import AsyncFetcher
+from engine import USER_AGENT
+from feed import HEADER, MAGIC, VERSION, MSG_RATES, frame, encode_rates, decode_rates
+
+logger = logging.getLogger("Cluster")
+logger.setLevel(logging.INFO)
+
+MSG_CHALLENGE = 32   # aggregator -> node, payload: nonce (unsigned)
+MSG_HELLO = 33       # node -> aggregator, payload: node id
+MAC_SIZE = 32
+MAX_FRAME = 16 * 1024 * 1024
+
+
+def _secret() -> bytes:
+    secret = os.getenv("CLUSTER_SECRET", "")
+    if not secret:
+        raise SystemExit("CLUSTER_SECRET must be set for cluster mode")
+    return secret.encode()
+
+def _address(value: str) -> Tuple[str, int]:
+    host, _, port = value.rpartition(":")
+    return host or "0.0.0.0", int(port)
+
+def _mac(key: bytes, data: bytes) -> bytes:
+    return hmac.new(key, data, hashlib.sha256).digest()
+
+def _signed(key: bytes, msg_type: int, seq: int, payload: bytes) -> bytes:
+    data = frame(msg_type, seq, payload)
+    return data + _mac(key, data)
+
+async def _read_signed(reader: asyncio.StreamReader, key: bytes, max_len: int = MAX_FRAME) -> Tuple[int, int, float, bytes]:
+    head = await reader.readexactly(HEADER.size)
+    magic, version, msg_type, seq, ts, length = HEADER.unpack(head)
+    if magic != MAGIC or version != VERSION or length > max_len:
+        raise ValueError("Bad frame header")
+    body = await reader.readexactly(length + MAC_SIZE)
+    payload, mac = body[:length], body[length:]
+    if not hmac.compare_digest(mac, _mac(key, head + payload)):
+        raise ValueError("Bad frame signature")
+    return msg_type, seq, ts, payload
+
+async def _read_unsigned(reader: asyncio.StreamReader) -> Tuple[int, int, float, bytes]:
+    magic, version, msg_type, seq, ts, length = HEADER.unpack(await reader.readexactly(HEADER.size))
+    if magic != MAGIC or version != VERSION or length > 1024:
+        raise ValueError("Bad frame header")
+    return msg_type, seq, ts, await reader.readexactly(length)
+
+# MSG_RATES payload: u8 venue length + venue name, then feed.encode_rates (venue survives empty results),
+# then per rate: mark price, index price, next funding time, venue event time (f64, NaN when unknown)
+EXTRAS_REC = struct.Struct("!dddd")
+NAN = float("nan")
+
+def encode_venue_rates(venue: str, rates: List[FundingRate]) -> bytes:
+    name = venue.encode()
+    extras = b"".join(EXTRAS_REC.pack(*(NAN if v is None else v for v in (r.mark_price, r.index_price, r.next_funding_time, r.event_time)))
+                      for r in rates)
+    return bytes((len(name),)) + name + encode_rates(rates) + extras
+
+def decode_venue_rates(payload: bytes) -> Tuple[str, List[FundingRate]]:
+    n = payload[0]
+    venue = payload[1:1 + n].decode()
+    records, off = decode_rates(payload, 1 + n)
+    extras = EXTRAS_REC.iter_unpack(memoryview(payload)[off:off + len(records) * EXTRAS_REC.size])
+    construct = FundingRate.model_construct
+    return venue, [construct(exchange=r.exchange, symbol=r.symbol, rate=r.rate, timestamp=r.timestamp,
+                             mark_price=_opt(mark), index_price=_opt(index), next_funding_time=_opt(nxt), event_time=_opt(evt))
+                   for r, (mark, index, nxt, evt) in zip(records, extras)]
+
+def _opt(v: float) -> Optional[float]:
+    return None if math.isnan(v) else v
+
+
+class FetchNode:
+    """Polls its venues and streams each one's rates the moment it lands; reconnects with backoff."""
+
+    def __init__(self, address: Tuple[str, int], node_id: str, exchanges: Optional[List[str]] = None,
+                 interval: float = 0.0, secret: Optional[bytes] = None):
+        self.address = address
+        self.node_id = node_id
+        self.interval = interval
+        self.secret = secret or _secret()
+        self.fetcher = AsyncFetcher(USER_AGENT, exchanges)
+        # Wall-clock based so a restarted node keeps increasing past the aggregator's last seen seq
+        self.seq = int(time.time() * 1000)
+
+    async def run(self):
+        await self.fetcher.start_session()
+        backoff = 1.0
+        try:
+            while True:
+                writer = None
+                try:
+                    reader, writer = await asyncio.open_connection(*self.address)
+                    msg_type, _, _, nonce = await asyncio.wait_for(_read_unsigned(reader), 10)
+                    if msg_type != MSG_CHALLENGE: raise ValueError("Expected challenge")
+                    key = _mac(self.secret, nonce)
+                    writer.write(self._frame(key, MSG_HELLO, self.node_id.encode()))
+                    logger.info(f"Connected to aggregator {self.address[0]}:{self.address[1]} as '{self.node_id}'")
+                    backoff = 1.0
+                    await self._stream(writer, key)
+                except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError) as e:
+                    logger.warning(f"Aggregator connection lost ({e!r}), retrying in {backoff:.0f}s")
+                finally:
+                    if writer: writer.close()
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+        finally:
+            await self.fetcher.close()
+
+    def _frame(self, key: bytes, msg_type: int, payload: bytes) -> bytes:
+        self.seq += 1
+        return _signed(key, msg_type, self.seq, payload)
+
+    async def _stream(self, writer: asyncio.StreamWriter, key: bytes):
+        while True:
+            start = time.perf_counter()
+            async for name, rates in self.fetcher.iter_all():
+                writer.write(self._frame(key, MSG_RATES, encode_venue_rates(name, rates)))
+                await writer.drain()
+            await asyncio.sleep(max(0.0, self.interval - (time.perf_counter() - start)))
+
+
+class ClusterAggregator:
+    """Accepts node streams and stands in for AsyncFetcher inside ArbitrageEngine.
+
+    Each (node, venue) keeps its latest batch; frames whose seq is not above the node's last
+    accepted seq are dropped as duplicates. When several nodes cover a venue, the freshest
+    non-empty batch wins; batches older than CLUSTER_STALE_AFTER seconds are discarded.
+    """
+
+    def __init__(self, address: Tuple[str, int], secret: Optional[bytes] = None):
+        self.address = address
+        self.secret = secret or _secret()
+        self.stale_after = float(os.getenv("CLUSTER_STALE_AFTER", 30))
+        # Max time a cycle waits for new node data (keeps FETCH_INTERVAL=0 from spinning)
+        self.wait = float(os.getenv("CLUSTER_WAIT", 5))
+        self.latest: Dict[Tuple[str, str], Tuple[float, List[FundingRate]]] = {}
+        self.last_seq: Dict[str, int] = {}
+        self.nodes: Dict[str, dict] = {}
+        self.session = None  # the TCP server; named for AsyncFetcher compatibility
+        self.updated = None
+        self.last_report = {}
+        self._writers = set()
+
+    @classmethod
+    def from_env(cls) -> Optional["ClusterAggregator"]:
+        listen = os.getenv("CLUSTER_LISTEN")
+        return cls(_address(listen)) if listen else None
+
+    async def start_session(self):
+        self.updated = asyncio.Event()
+        self.session = await asyncio.start_server(self._handle, *self.address)
+        logger.info(f"Cluster aggregator listening on {self.address[0]}:{self.address[1]}")
+
+    async def close(self):
+        if self.session:
+            self.session.close()
+            for writer in list(self._writers): writer.close()
+            await self.session.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        peer = writer.get_extra_info("peername")
+        node = None
+        self._writers.add(writer)
+        try:
+            nonce = os.urandom(16)
+            writer.write(frame(MSG_CHALLENGE, 0, nonce))
+            key = _mac(self.secret, nonce)
+            msg_type, seq, _, payload = await asyncio.wait_for(_read_signed(reader, key, 256), 10)
+            if msg_type != MSG_HELLO: raise ValueError("Expected hello")
+            node = payload.decode()
+            self.last_seq[node] = max(self.last_seq.get(node, 0), seq)
+            stats = self.nodes.setdefault(node, {"frames": 0, "duplicates": 0})
+            stats.update(connected=True, peer=str(peer))
+            logger.info(f"Node '{node}' connected from {peer}")
+            while True:
+                msg_type, seq, _, payload = await _read_signed(reader, key)
+                if msg_type != MSG_RATES: continue
+                if seq <= self.last_seq[node]:
+                    stats["duplicates"] += 1
+                    continue
+                self.last_seq[node] = seq
+                venue, rates = decode_venue_rates(payload)
+                now = time.time()
+                self.latest[(node, venue)] = (now, rates)
+                stats["frames"] += 1
+                stats["last_seen"] = now
+                self.updated.set()
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError, ValueError, UnicodeDecodeError) as e:
+            if not isinstance(e, asyncio.IncompleteReadError):
+                logger.warning(f"Dropping connection from {peer}: {e!r}")
+        finally:
+            if node in self.nodes: self.nodes[node]["connected"] = False
+            self._writers.discard(writer)
+            writer.close()
+
+    def merged(self) -> Dict[str, List[FundingRate]]:
+        now = time.time()
+        best: Dict[str, Tuple[bool, float, List[FundingRate]]] = {}
+        for key, (received, rates) in list(self.latest.items()):
+            if now - received > self.stale_after:
+                del self.latest[key]
+                continue
+            candidate = (bool(rates), received, rates)
+            current = best.get(key[1])
+            if current is None or candidate[:2] > current[:2]:
+                best[key[1]] = candidate
+        return {venue: rates for venue, (_, _, rates) in best.items()}
+
+    async def iter_all(self):
+        try:
+            await asyncio.wait_for(self.updated.wait(), self.wait)
+        except asyncio.TimeoutError:
+            pass
+        self.updated.clear()
+        merged = self.merged()
+        self.last_report = {venue: len(rates) for venue, rates in merged.items()}
+        for venue, rates in merged.items():
+            yield venue, rates
+
+    async def fetch_all(self) -> List[FundingRate]:
+        flat_results = []
+        async for _, res in self.iter_all():
+            flat_results.extend(res)
+        return flat_results
+
+
+async def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Run a fetch node that streams rates to a cluster aggregator")
+    parser.add_argument("--connect", default=os.getenv("CLUSTER_CONNECT", "127.0.0.1:7700"), help="aggregator host:port")
+    parser.add_argument("--exchanges", help="comma-separated venues this node polls (default: EXCHANGES config)")
+    parser.add_argument("--id", default=os.getenv("CLUSTER_NODE_ID", socket.gethostname()), help="node id")
+    parser.add_argument("--interval", type=float, default=float(os.getenv("FETCH_INTERVAL", 0)))
+    args = parser.parse_args(argv)
+
+    exchanges = [e.strip() for e in args.exchanges.split(",") if e.strip()] if args.exchanges else None
+    await FetchNode(_address(args.connect), args.id, exchanges, args.interval).run()
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,193 @@
+import os
+import sys
+import json
+import time
+import queue
+import logging
+import logging.handlers
+from typing import List, Dict, Any, Optional
+from rich.console import Console, Group
+from rich.live import Live
+from rich.table import Table
+from rich.panel import Panel
+from rich import box
+
+from models import Opportunity
+
+logger = logging.getLogger("Console")
+logger.setLevel(logging.INFO)
+
+console = Console()
+
+
+def is_headless() -> bool:
+    # HEADLESS=1/0 forces the mode; otherwise run headless whenever there is no terminal (e.g. docker logs)
+    flag = os.getenv("HEADLESS", "").strip()
+    if flag: return flag == "1"
+    return not sys.stdout.isatty()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields: entry.update(fields)
+        if record.exc_info: entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, separators=(",", ":"), default=str)
+
+
+_listener = None
+
+def setup_logging(headless: bool):
+    """Route all logging through a QueueHandler so the event loop never blocks on stdout."""
+    global _listener
+    if _listener: return
+    if headless:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(JsonFormatter())
+    else:
+        from rich.logging import RichHandler
+        handler = RichHandler(console=console, show_path=False)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(logging.INFO)
+    _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+
+def stop_logging():
+    global _listener
+    if _listener:
+        _listener.stop()
+        _listener = None
+
+
+class CycleStats:
+    """Per-cycle numbers handed from the engine to whichever view is active."""
+    __slots__ = ("total_rates", "total_pairs", "latency", "opportunities", "report", "ttfo")
+
+    def __init__(self, total_rates: int, total_pairs: int, latency: float,
+                 opportunities: List[Opportunity], report: Dict[str, Any], ttfo: Optional[float] = None):
+        self.total_rates = total_rates
+        self.total_pairs = total_pairs
+        self.latency = latency
+        self.opportunities = opportunities
+        self.report = report
+        self.ttfo = ttfo  # time to first opportunity within the cycle
+
+
+class LiveDashboard:
+    """Single in-place terminal view, redrawn at UI_FPS independent of the engine cycle rate."""
+
+    def __init__(self):
+        self.fps = float(os.getenv("UI_FPS", 4))
+        self.stats = None
+        self.live = Live(console=console, get_renderable=self._render, auto_refresh=True,
+                         refresh_per_second=self.fps, transient=False)
+
+    def start(self):
+        console.print(Panel.fit("[bold green]🚀 Arbitrage Engine Active[/bold green]", border_style="green"))
+        self.live.start()
+
+    def stop(self):
+        self.live.stop()
+
+    def update(self, stats: CycleStats):
+        # Only swap the reference; the tables are built on the refresh thread at the capped frame rate
+        self.stats = stats
+
+    def _render(self):
+        stats = self.stats
+        if stats is None:
+            return Panel("[dim]Waiting for first cycle...[/dim]", title="Status")
+
+        summary = Table(box=box.SIMPLE, show_header=False)
+        summary.add_column("Key", style="cyan")
+        summary.add_column("Val", style="bold white")
+        summary.add_row("⏱️ Latency", f"{stats.latency:.3f}s")
+        summary.add_row("⚡ First Opp", f"{stats.ttfo:.3f}s" if stats.ttfo is not None else "-")
+        summary.add_row("📡 Points", f"{stats.total_rates}")
+        summary.add_row("🔄 Pairs", f"{stats.total_pairs}")
+
+        venues = " ".join(
+            f"[green]{name} {count}[/green]" if isinstance(count, int) and count > 0 else f"[red]{name} {count}[/red]"
+            for name, count in stats.report.items()
+        )
+        summary.add_row("🔍 Venues", venues)
+
+        # Display Table with REAL spread
+        opp_table = Table(title="🏆 TOP OPPORTUNITIES (Per Round)", box=box.ROUNDED)
+        opp_table.add_column("#", style="yellow")
+        opp_table.add_column("Pair", style="bold white")
+        opp_table.add_column("Spread", justify="right", style="bold green")
+        opp_table.add_column("Long (Buy)", style="blue")
+        opp_table.add_column("Short (Sell)", style="red")
+
+        for i, o in enumerate(stats.opportunities[:10], 1):
+            opp_table.add_row(
+                str(i),
+                o.symbol,
+                f"{o.spread:.4f}%",
+                f"{o.long_leg} ({o.long_rate:.4f}%)",
+                f"{o.short_leg} ({o.short_rate:.4f}%)"
+            )
+
+        status = Panel(summary, title="Status")
+        return Group(status, opp_table) if stats.opportunities else status
+
+
+class HeadlessReporter:
+    """Aggregates cycles and logs one structured summary every LOG_SUMMARY_INTERVAL seconds."""
+
+    def __init__(self):
+        self.interval = float(os.getenv("LOG_SUMMARY_INTERVAL", 60))
+        self._reset(time.monotonic())
+
+    def _reset(self, now: float):
+        self.window_start = now
+        self.cycles = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.ttfo_sum = 0.0
+        self.ttfo_count = 0
+        self.failures: Dict[str, int] = {}
+
+    def start(self):
+        logger.info("Arbitrage engine active", extra={"fields": {"mode": "headless", "summary_interval": self.interval}})
+
+    def stop(self):
+        pass
+
+    def update(self, stats: CycleStats):
+        self.cycles += 1
+        self.latency_sum += stats.latency
+        self.latency_max = max(self.latency_max, stats.latency)
+        if stats.ttfo is not None:
+            self.ttfo_sum += stats.ttfo
+            self.ttfo_count += 1
+        for name, count in stats.report.items():
+            if not (isinstance(count, int) and count > 0):
+                self.failures[name] = self.failures.get(name, 0) + 1
+
+        now = time.monotonic()
+        if now - self.window_start < self.interval: return
+
+        top = stats.opportunities[0] if stats.opportunities else None
+        logger.info("cycle summary", extra={"fields": {
+            "cycles": self.cycles,
+            "latency_avg": round(self.latency_sum / self.cycles, 4),
+            "latency_max": round(self.latency_max, 4),
+            "ttfo_avg": round(self.ttfo_sum / self.ttfo_count, 4) if self.ttfo_count else None,
+            "points": stats.total_rates,
+            "pairs": stats.total_pairs,
+            "opportunities": len(stats.opportunities),
+            "top": f"{top.symbol} {top.spread:.4f}% {top.long_leg}->{top.short_leg}" if top else None,
+            "venue_failures": self.failures,
+        }})
+        self._reset(now)
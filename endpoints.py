@@ -0,0 +1,73 @@
+import os
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+
+class EndpointStats:
+    """Rolling health of one URL: EWMA latency, EWMA success rate and a latency window for p95."""
+    __slots__ = ("ewma", "success", "samples", "requests", "failures", "window")
+
+    ALPHA = 0.2
+
+    def __init__(self, window: int = 64):
+        self.ewma: Optional[float] = None
+        self.success = 1.0
+        self.samples: deque = deque(maxlen=window)
+        self.requests = 0
+        self.failures = 0
+
+    def record(self, latency: float, ok: bool):
+        self.requests += 1
+        self.success += self.ALPHA * ((1.0 if ok else 0.0) - self.success)
+        if not ok:
+            self.failures += 1
+            return
+        self.ewma = latency if self.ewma is None else self.ewma + self.ALPHA * (latency - self.ewma)
+        self.samples.append(latency)
+
+    def p95(self) -> Optional[float]:
+        if len(self.samples) < 8: return None
+        ordered = sorted(self.samples)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    @property
+    def healthy(self) -> bool:
+        return self.success >= 0.5
+
+    def report(self) -> dict:
+        p95 = self.p95()
+        return {
+            "ewma_ms": round(self.ewma * 1000, 1) if self.ewma is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "success": round(self.success, 3),
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+
+class EndpointPool:
+    """Mirror URLs of one venue, ranked fastest-healthy first.
+
+    Unmeasured mirrors rank first so each gets a baseline; after that every ENDPOINT_EXPLORE-th
+    request goes to the runner-up so a recovered or faster mirror is noticed without extra traffic.
+    """
+
+    def __init__(self, urls: Tuple[str, ...], explore_every: Optional[int] = None):
+        self.urls = urls
+        self.stats: Dict[str, EndpointStats] = {url: EndpointStats() for url in urls}
+        self.explore_every = explore_every or int(os.getenv("ENDPOINT_EXPLORE", 20))
+        self.picks = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def ranked(self) -> List[str]:
+        stats = self.stats
+        order = sorted(self.urls, key=lambda u: (not stats[u].healthy, stats[u].ewma or 0.0))
+        self.picks += 1
+        if len(order) > 1 and self.picks % self.explore_every == 0:
+            order[0], order[1] = order[1], order[0]
+        return order
+
+    def report(self) -> dict:
+        return {"endpoints": {url: s.report() for url, s in self.stats.items()},
+                "hedges": self.hedges, "hedge_wins": self.hedge_wins}
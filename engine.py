@@ -0,0 +1,213 @@
+import os
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from models import FundingRate, Opportunity
+from adapters import default_exchanges, env_list, load_plugins
+from fetcher import AsyncFetcher
+from spread_book import SpreadBook
+from instruments import Grouping
+from freshness import FreshnessTracker
+from spread_stats import FUNDING_PERIOD, SpreadStatsTracker, rank
+from tracer import tracer
+
+logger = logging.getLogger("Engine")
+logger.setLevel(logging.INFO)
+
+
+def process_age() -> float:
+    # Seconds since the process was exec'd (Linux /proc), so interpreter startup and imports are counted too
+    try:
+        with open("/proc/self/stat") as f:
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0.0
+
+# Reference point for start-to-first-cycle latency (process start on Linux, else this import)
+STARTED = time.perf_counter() - process_age()
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+
+@dataclass
+class EngineConfig:
+    min_spread: float = 0.025
+    fetch_interval: float = 0.0
+    # Fold exchange results into the ranking as they arrive instead of waiting for the slowest venue
+    pipeline: bool = False
+    # Final ranking key: spread | ewma | mean | time_above | persistence
+    rank_by: str = "spread"
+    exchanges: Optional[List[str]] = None  # None: every registered venue not off by default
+    plugins: List[str] = field(default_factory=list)  # modules that register extra venues
+    user_agent: str = USER_AGENT
+    hedge: bool = False      # race the runner-up mirror once the primary passes its p95
+    capture_path: str = ""   # raw-payload capture log (capture.py), "" = off
+    # Instruments compared as one pair: '='-joined interchangeable quotes, one class per comma;
+    # margin_equivalence also pairs inverse (coin-margined) contracts with linear ones
+    quote_equivalence: str = "USDT=USDC=USD"
+    margin_equivalence: bool = True
+    # Opportunities whose older leg is older than this (seconds, 0 = off) are flagged, or dropped
+    stale_max_age: float = 300.0
+    stale_policy: str = "flag"  # flag | drop
+    # A leg counts as changed for CycleResult.changes once its rate moves more than this (in %)
+    change_tolerance: float = 0.0005
+    # Route statistics (spread_stats.py); stats_threshold None: min_spread
+    stats_threshold: Optional[float] = None
+    stats_half_life: float = 3600.0
+    stats_max_pairs: int = 5000
+    stats_ttl: float = 3 * FUNDING_PERIOD
+    stats_routes: int = 4
+    # Clock-skew / age estimation (freshness.py)
+    freshness_skew_window: int = 64
+    freshness_window: int = 512
+    freshness_max_skew: float = 10.0
+
+    @classmethod
+    def from_env(cls) -> "EngineConfig":
+        return cls(
+            min_spread=float(os.getenv("MIN_SPREAD", 0.025)),
+            fetch_interval=float(os.getenv("FETCH_INTERVAL", 0)),
+            pipeline=os.getenv("PIPELINE", "0") == "1",
+            rank_by=os.getenv("RANK_BY", "spread"),
+            quote_equivalence=os.getenv("QUOTE_EQUIVALENCE", "USDT=USDC=USD"),
+            margin_equivalence=os.getenv("MARGIN_EQUIVALENCE", "1") == "1",
+            stale_max_age=float(os.getenv("STALE_MAX_AGE", 300)),
+            stale_policy=os.getenv("STALE_POLICY", "flag"),
+            change_tolerance=float(os.getenv("CHANGE_TOLERANCE", 0.0005)),
+            exchanges=env_list("EXCHANGES") or None,
+            plugins=env_list("EXCHANGE_PLUGINS"),
+            hedge=os.getenv("HEDGE", "0") == "1",
+            capture_path=os.getenv("CAPTURE_PATH", ""),
+            stats_threshold=float(os.getenv("STATS_THRESHOLD", os.getenv("MIN_SPREAD", 0.025))),
+            stats_half_life=float(os.getenv("STATS_HALF_LIFE", 3600)),
+            stats_max_pairs=int(os.getenv("STATS_MAX_PAIRS", 5000)),
+            stats_ttl=float(os.getenv("STATS_TTL", 3 * FUNDING_PERIOD)),
+            stats_routes=int(os.getenv("STATS_ROUTES", 4)),
+            freshness_skew_window=int(os.getenv("FRESHNESS_SKEW_WINDOW", 64)),
+            freshness_window=int(os.getenv("FRESHNESS_WINDOW", 512)),
+            freshness_max_skew=float(os.getenv("FRESHNESS_MAX_SKEW", 10)),
+        )
+
+
+@dataclass
+class CycleResult:
+    rates: List[FundingRate]
+    opportunities: List[Opportunity]
+    total_pairs: int
+    latency: float
+    ttfo: Optional[float] = None  # time to first opportunity within the cycle
+    report: Dict[str, object] = field(default_factory=dict)  # per-venue row counts / "ERR"
+    spreads: Dict[str, float] = field(default_factory=dict)  # every symbol's best spread, below min_spread too
+    # Symbols whose legs changed since the previous cycle -> Opportunity (None: below min_spread / gone)
+    changes: Optional[Dict[str, Optional[Opportunity]]] = None
+
+
+class ArbitrageEngine:
+    """UI-free scan engine: fetch every venue, rank cross-exchange spreads, annotate route stats.
+
+        async with ArbitrageEngine(EngineConfig(min_spread=0.05)) as engine:
+            result = await engine.scan_once()
+            async for result in engine.cycles(): ...
+    """
+
+    def __init__(self, config: Optional[EngineConfig] = None, fetcher=None):
+        # Everything comes from `config`; only EngineConfig.from_env() (the default) reads the environment
+        self.config = config = config or EngineConfig.from_env()
+        # Any rate source with AsyncFetcher's start_session/iter_all/fetch_all/close (e.g. cluster.ClusterAggregator)
+        if fetcher is None:
+            load_plugins(config.plugins)
+            exchanges = config.exchanges if config.exchanges is not None else default_exchanges()
+            fetcher = AsyncFetcher(config.user_agent, exchanges, plugins=[], hedge=config.hedge, capture_path=config.capture_path)
+        self.fetcher = fetcher
+        self.stats = SpreadStatsTracker(config.stats_threshold if config.stats_threshold is not None else config.min_spread,
+                                        config.stats_half_life, config.stats_max_pairs, config.stats_ttl, config.stats_routes)
+        self.grouping = Grouping(config.quote_equivalence, config.margin_equivalence)
+        self.freshness = FreshnessTracker(config.freshness_skew_window, config.freshness_window, config.freshness_max_skew)
+        self.first_cycle_latency = None  # seconds from process start to the first completed scan
+        self._last_book: Optional[SpreadBook] = None
+
+    async def start(self):
+        await self.fetcher.start_session()
+
+    async def close(self):
+        await self.fetcher.close()
+
+    async def __aenter__(self) -> "ArbitrageEngine":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _book(self, chained: bool = False) -> SpreadBook:
+        # chained: diff against the previous cycle's book for CycleResult.changes
+        return SpreadBook(self.config.min_spread, self.grouping, self.freshness.age,
+                          self.config.stale_max_age, self.config.stale_policy == "drop",
+                          self._last_book if chained else None, self.config.change_tolerance)
+
+    def calculate_arbitrage(self, rates: List[FundingRate]) -> List[Opportunity]:
+        book = self._book()
+        book.add(rates)
+        return book.ranked()
+
+    async def scan_once(self, on_provisional: Optional[Callable[[List[Opportunity], int], None]] = None) -> CycleResult:
+        """One full cycle. In pipeline mode `on_provisional(opportunities, pair_count)` fires per venue."""
+        start_time = time.perf_counter()
+        first_opp_at = None
+
+        with tracer.span("fetch_all"):
+            if self.config.pipeline:
+                book = self._book(chained=True)
+                all_rates = []
+                async for name, rates in self.fetcher.iter_all():
+                    all_rates.extend(rates)
+                    self.freshness.observe(rates)
+                    with tracer.span("fold", exchange=name, rates=len(rates)):
+                        book.add(rates)
+                        provisional = book.ranked()
+                    if provisional and first_opp_at is None:
+                        first_opp_at = time.perf_counter()
+                    if on_provisional: on_provisional(provisional, book.pair_count)
+            else:
+                all_rates = await self.fetcher.fetch_all()
+                self.freshness.observe(all_rates)
+                book = self._book(chained=True)
+
+        self.freshness.ranked(all_rates, time.time())
+        total_pairs = len(set(r.symbol for r in all_rates))
+
+        with tracer.span("calculate_arbitrage", rates=len(all_rates)):
+            if not self.config.pipeline: book.add(all_rates)
+            opps = book.ranked()
+            changes = book.changes()
+            self._last_book = book
+        with tracer.span("spread_stats", opportunities=len(opps)):
+            routes = book.routes(self.stats.routes_per_symbol, self.stats.streaking)
+            opps = rank(self.stats.annotate(opps, time.time(), routes), self.config.rank_by)
+            # annotate() returns copies: point the changes at the published objects
+            by_symbol = {o.symbol: o for o in opps}
+            changes = {sym: by_symbol.get(sym) if opp is not None else None for sym, opp in changes.items()}
+        if first_opp_at is None and opps:
+            first_opp_at = time.perf_counter()
+
+        now = time.perf_counter()
+        if self.first_cycle_latency is None:
+            self.first_cycle_latency = now - STARTED
+            logger.info(f"First cycle completed {self.first_cycle_latency:.3f}s after process start")
+        return CycleResult(all_rates, opps, total_pairs, now - start_time,
+                           first_opp_at - start_time if first_opp_at else None, dict(self.fetcher.last_report),
+                           book.spreads(), changes)
+
+    async def cycles(self, on_provisional: Optional[Callable[[List[Opportunity], int], None]] = None) -> AsyncIterator[CycleResult]:
+        """Scan forever, pacing cycles to at least `fetch_interval` seconds apart."""
+        if not self.fetcher.session: await self.start()
+        while True:
+            result = await self.scan_once(on_provisional)
+            yield result
+            await asyncio.sleep(max(0, self.config.fetch_interval - result.latency))
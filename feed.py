@@ -0,0 +1,190 @@
+import os
+import time
+import struct
+import asyncio
+import logging
+from collections import namedtuple
+from typing import List, Tuple, Optional
+
+logger = logging.getLogger("Feed")
+logger.setLevel(logging.INFO)
+
+# FRAMING
+# Header (24 bytes, network order): magic u16 | version u8 | type u8 | seq u64 | timestamp f64 | payload length u32
+# Payload: string table (u16 count, then u8 len + utf-8 bytes each) followed by fixed-size records
+# that reference strings by u16 index.
+MAGIC = 0xA7E1
+VERSION = 3
+HEADER = struct.Struct("!HBBQdI")
+
+MSG_RATES = 1
+MSG_OPPORTUNITIES = 2
+MSG_SNAPSHOT = 3            # rates block + opportunities block, seq = last published frame
+MSG_PROVISIONAL = 4         # mid-cycle ranking (pipeline mode), same payload as MSG_OPPORTUNITIES
+MSG_SNAPSHOT_REQUEST = 16   # client -> server, empty payload
+
+RATE_REC = struct.Struct("!HHdd")        # exchange, symbol, rate, timestamp
+OPP_REC = struct.Struct("!HHHHHdddfB")   # symbol, long exchange, short exchange, long/short instrument, long rate,
+                                         # short rate, spread, max leg age (s, NaN unknown), flags
+OPP_STALE = 0x01
+COUNT = struct.Struct("!I")
+NAN = float("nan")
+
+RateRecord = namedtuple("RateRecord", "exchange symbol rate timestamp")
+OppRecord = namedtuple("OppRecord", "symbol long_exchange long_rate short_exchange short_rate spread long_symbol short_symbol max_leg_age stale")
+
+
+class _Strings:
+    def __init__(self):
+        self.index = {}
+
+    def __call__(self, s: str) -> int:
+        i = self.index.get(s)
+        if i is None:
+            i = self.index[s] = len(self.index)
+        return i
+
+    def encode(self) -> bytes:
+        out = [struct.pack("!H", len(self.index))]
+        for s in self.index:
+            b = s.encode()
+            out.append(bytes((len(b),)) + b)
+        return b"".join(out)
+
+
+def _decode_strings(buf: memoryview, off: int) -> Tuple[List[str], int]:
+    (n,) = struct.unpack_from("!H", buf, off)
+    off += 2
+    strings = []
+    for _ in range(n):
+        ln = buf[off]
+        strings.append(bytes(buf[off + 1:off + 1 + ln]).decode())
+        off += 1 + ln
+    return strings, off
+
+
+def encode_rates(rates) -> bytes:
+    s = _Strings()
+    body = b"".join(RATE_REC.pack(s(r.exchange), s(r.symbol), r.rate, r.timestamp) for r in rates)
+    return s.encode() + COUNT.pack(len(rates)) + body
+
+def encode_opportunities(opps) -> bytes:
+    s = _Strings()
+    body = b"".join(OPP_REC.pack(s(o.symbol), s(o.long_exchange), s(o.short_exchange), s(o.long_symbol or o.symbol),
+                                 s(o.short_symbol or o.symbol), o.long_rate, o.short_rate, o.spread,
+                                 NAN if o.max_leg_age is None else o.max_leg_age, OPP_STALE if o.stale else 0)
+                    for o in opps)
+    return s.encode() + COUNT.pack(len(opps)) + body
+
+def decode_rates(buf, off: int = 0) -> Tuple[List[RateRecord], int]:
+    buf = memoryview(buf)
+    strings, off = _decode_strings(buf, off)
+    (n,) = COUNT.unpack_from(buf, off)
+    off += COUNT.size
+    out = [RateRecord(strings[e], strings[sym], rate, ts) for e, sym, rate, ts in RATE_REC.iter_unpack(buf[off:off + n * RATE_REC.size])]
+    return out, off + n * RATE_REC.size
+
+def decode_opportunities(buf, off: int = 0) -> Tuple[List[OppRecord], int]:
+    buf = memoryview(buf)
+    strings, off = _decode_strings(buf, off)
+    (n,) = COUNT.unpack_from(buf, off)
+    off += COUNT.size
+    out = [OppRecord(strings[sym], strings[l], lr, strings[sh], sr, sp, strings[li], strings[si],
+                     None if age != age else age, bool(flags & OPP_STALE))
+           for sym, l, sh, li, si, lr, sr, sp, age, flags in OPP_REC.iter_unpack(buf[off:off + n * OPP_REC.size])]
+    return out, off + n * OPP_REC.size
+
+def frame(msg_type: int, seq: int, payload: bytes = b"", ts: Optional[float] = None) -> bytes:
+    return HEADER.pack(MAGIC, VERSION, msg_type, seq, time.time() if ts is None else ts, len(payload)) + payload
+
+async def read_frame(reader: asyncio.StreamReader) -> Tuple[int, int, float, bytes]:
+    magic, version, msg_type, seq, ts, length = HEADER.unpack(await reader.readexactly(HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Bad frame header (magic={magic:#x}, version={version})")
+    payload = await reader.readexactly(length) if length else b""
+    return msg_type, seq, ts, payload
+
+
+class FeedServer:
+    """Publishes each cycle's rates and opportunities to local subscribers over a Unix-domain socket.
+
+    Frames carry a monotonically increasing sequence number. A subscriber that falls behind has
+    frames dropped (never blocking the engine), notices the gap and sends MSG_SNAPSHOT_REQUEST.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.buffer = int(os.getenv("FEED_CLIENT_BUFFER", 256))
+        self.seq = 0
+        self.clients = set()
+        self.server = None
+        self._rates_payload = encode_rates([])
+        self._opps_payload = encode_opportunities([])
+
+    async def start(self):
+        if os.path.exists(self.path): os.remove(self.path)
+        self.server = await asyncio.start_unix_server(self._handle, path=self.path)
+        logger.info(f"Binary feed listening on {self.path}")
+
+    async def close(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        for queue, _ in list(self.clients):
+            while not queue.empty(): queue.get_nowait()
+            queue.put_nowait(None)
+        if os.path.exists(self.path): os.remove(self.path)
+
+    def publish(self, rates, opportunities):
+        # Encode once, fan the bytes out to every subscriber. rates=None publishes a provisional
+        # (mid-cycle) ranking as MSG_PROVISIONAL; snapshots only ever carry a final ranking.
+        ts = time.time()
+        if rates is None:
+            self._broadcast(MSG_PROVISIONAL, encode_opportunities(opportunities), ts)
+            return
+        self._rates_payload = encode_rates(rates)
+        self._broadcast(MSG_RATES, self._rates_payload, ts)
+        self._opps_payload = encode_opportunities(opportunities)
+        self._broadcast(MSG_OPPORTUNITIES, self._opps_payload, ts)
+
+    def _broadcast(self, msg_type: int, payload: bytes, ts: float):
+        self.seq += 1
+        data = frame(msg_type, self.seq, payload, ts)
+        for queue, _ in self.clients:
+            try: queue.put_nowait(data)
+            except asyncio.QueueFull: pass  # subscriber detects the gap and resyncs
+
+    def _snapshot(self) -> bytes:
+        return frame(MSG_SNAPSHOT, self.seq, self._rates_payload + self._opps_payload)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        queue = asyncio.Queue(maxsize=self.buffer)
+        client = (queue, writer)
+        self.clients.add(client)
+        queue.put_nowait(self._snapshot())
+        sender = asyncio.create_task(self._send(queue, writer))
+        try:
+            while True:
+                msg_type, _, _, _ = await read_frame(reader)
+                if msg_type == MSG_SNAPSHOT_REQUEST:
+                    # Jump the line: stale frames already queued are superseded by the snapshot
+                    while not queue.empty(): queue.get_nowait()
+                    queue.put_nowait(self._snapshot())
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self.clients.discard(client)
+            sender.cancel()
+            writer.close()
+
+    async def _send(self, queue: asyncio.Queue, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                data = await queue.get()
+                if data is None: break
+                writer.write(data)
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
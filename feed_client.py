@@ -0,0 +1,107 @@
+"""Reference subscriber for the engine's binary feed (FEED_SOCKET).
+
+    python feed_client.py /tmp/athena.sock
+"""
+import sys
+import asyncio
+from typing import List, Optional
+
+from feed import (
+    MSG_RATES, MSG_OPPORTUNITIES, MSG_PROVISIONAL, MSG_SNAPSHOT, MSG_SNAPSHOT_REQUEST,
+    RateRecord, OppRecord, decode_rates, decode_opportunities, frame, read_frame,
+)
+
+
+class FeedMessage:
+    __slots__ = ("type", "seq", "timestamp", "rates", "opportunities")
+
+    def __init__(self, msg_type: int, seq: int, timestamp: float,
+                 rates: Optional[List[RateRecord]] = None, opportunities: Optional[List[OppRecord]] = None):
+        self.type = msg_type
+        self.seq = seq
+        self.timestamp = timestamp
+        self.rates = rates
+        self.opportunities = opportunities
+
+    @property
+    def provisional(self) -> bool:
+        """Mid-cycle ranking from the venues that have answered so far; a final one follows."""
+        return self.type == MSG_PROVISIONAL
+
+
+class FeedClient:
+    """Async iterator over feed messages with gap detection and automatic snapshot resync."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.reader = None
+        self.writer = None
+        self.expected_seq = None
+        self.gaps = 0
+        self._resyncing = False
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_unix_connection(self.path)
+
+    async def close(self):
+        if self.writer:
+            self.writer.close()
+            await self.writer.wait_closed()
+
+    async def request_snapshot(self):
+        self._resyncing = True
+        self.writer.write(frame(MSG_SNAPSHOT_REQUEST, 0))
+        await self.writer.drain()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> FeedMessage:
+        while True:
+            try:
+                msg_type, seq, ts, payload = await read_frame(self.reader)
+            except asyncio.IncompleteReadError:
+                raise StopAsyncIteration
+
+            if msg_type == MSG_SNAPSHOT:
+                rates, off = decode_rates(payload)
+                opps, _ = decode_opportunities(payload, off)
+                self.expected_seq = seq + 1
+                self._resyncing = False
+                return FeedMessage(msg_type, seq, ts, rates, opps)
+
+            if self._resyncing or (self.expected_seq is not None and seq < self.expected_seq):
+                continue  # superseded by the snapshot we are waiting for
+            if self.expected_seq is not None and seq != self.expected_seq:
+                self.gaps += 1
+                await self.request_snapshot()
+                continue
+            self.expected_seq = seq + 1
+
+            if msg_type == MSG_RATES:
+                return FeedMessage(msg_type, seq, ts, rates=decode_rates(payload)[0])
+            if msg_type in (MSG_OPPORTUNITIES, MSG_PROVISIONAL):
+                return FeedMessage(msg_type, seq, ts, opportunities=decode_opportunities(payload)[0])
+
+
+async def _main(path: str):
+    client = FeedClient(path)
+    await client.connect()
+    try:
+        async for msg in client:
+            if msg.opportunities:
+                top = msg.opportunities[0]
+                kind = "provisional" if msg.provisional else "opps"
+                stale = " (stale)" if top.stale else ""
+                print(f"#{msg.seq} {len(msg.opportunities)} {kind} | top {top.symbol} {top.spread:.4f}%{stale} "
+                      f"{top.long_exchange} -> {top.short_exchange} | gaps {client.gaps}")
+            elif msg.rates is not None:
+                print(f"#{msg.seq} {len(msg.rates)} rates")
+    finally:
+        await client.close()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(_main(sys.argv[1] if len(sys.argv) > 1 else "/tmp/athena.sock"))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,87 @@
+import os
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+from models import FundingRate
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class FreshnessTracker:
+    """Per-venue clock skew and data-age estimates from exchange-provided event times.
+
+    For each batch, lag = local receive time - venue event time = real staleness + clock offset.
+    The offset is estimated as the smallest batch lag over the last FRESHNESS_SKEW_WINDOW batches
+    (the freshest row a venue sends is close to zero real staleness), so the age of a rate is
+    `now - (event_time + offset)`. Rates without an event time age from their receive time.
+
+    Only batches whose newest event time advanced feed the offset, so a frozen payload keeps ageing
+    instead of being absorbed as skew, and the offset is clamped to +-FRESHNESS_MAX_SKEW seconds so
+    a venue that is already stale when first seen is not mistaken for a skewed clock.
+    """
+
+    def __init__(self, skew_window: Optional[int] = None, age_window: Optional[int] = None,
+                 max_skew: Optional[float] = None):
+        self.skew_window = skew_window or int(os.getenv("FRESHNESS_SKEW_WINDOW", 64))
+        self.age_window = age_window or int(os.getenv("FRESHNESS_WINDOW", 512))
+        self.max_skew = max_skew if max_skew is not None else float(os.getenv("FRESHNESS_MAX_SKEW", 10))
+        self.lags: Dict[str, Deque[float]] = {}   # per-batch minimum lag, for the offset
+        self.offset: Dict[str, float] = {}
+        self.newest: Dict[str, float] = {}        # newest event time seen per venue
+        self.ages: Dict[str, Deque[float]] = {}   # venue-side age on arrival (skew-corrected)
+        self.pipeline: Dict[str, Deque[float]] = {}  # receive -> ranking, our side
+
+    def observe(self, rates: List[FundingRate]):
+        """Fold a batch of freshly fetched rates (one or more venues) into the estimates."""
+        lags: Dict[str, List[float]] = {}
+        newest: Dict[str, float] = {}
+        for r in rates:
+            if r.event_time is not None:
+                lags.setdefault(r.exchange, []).append(r.timestamp - r.event_time)
+                if r.event_time > newest.get(r.exchange, float("-inf")): newest[r.exchange] = r.event_time
+        for venue, values in lags.items():
+            if newest[venue] > self.newest.get(venue, float("-inf")):
+                self.newest[venue] = newest[venue]
+                window = self.lags.get(venue)
+                if window is None:
+                    window = self.lags[venue] = deque(maxlen=self.skew_window)
+                window.append(min(values))
+                self.offset[venue] = max(-self.max_skew, min(self.max_skew, min(window)))
+            offset = self.offset.get(venue, 0.0)
+            ages = self.ages.get(venue)
+            if ages is None:
+                ages = self.ages[venue] = deque(maxlen=self.age_window)
+            # One sample per batch: the batch median, so wide payloads don't flood the window
+            values.sort()
+            ages.append(max(0.0, values[len(values) // 2] - offset))
+
+    def age(self, rate: FundingRate, now: float) -> float:
+        if rate.event_time is None:
+            return now - rate.timestamp
+        return now - (rate.event_time + self.offset.get(rate.exchange, 0.0))
+
+    def ranked(self, rates: List[FundingRate], now: float):
+        """Record how long each venue's batch waited between receipt and ranking."""
+        seen = {}
+        for r in rates:
+            if r.exchange not in seen: seen[r.exchange] = r.timestamp
+        for venue, received in seen.items():
+            window = self.pipeline.get(venue)
+            if window is None:
+                window = self.pipeline[venue] = deque(maxlen=self.age_window)
+            window.append(max(0.0, now - received))
+
+    def report(self) -> Dict[str, dict]:
+        out = {}
+        for venue in sorted(self.ages.keys() | self.pipeline.keys()):
+            entry = {"skew": self.offset.get(venue)}
+            for name, windows in (("venue_age", self.ages), ("pipeline_age", self.pipeline)):
+                window = windows.get(venue)
+                if window:
+                    ordered = sorted(window)
+                    entry[name] = {"p50": _percentile(ordered, 0.5), "p95": _percentile(ordered, 0.95),
+                                   "p99": _percentile(ordered, 0.99), "samples": len(ordered)}
+            out[venue] = entry
+        return out
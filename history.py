@@ -0,0 +1,165 @@
+import os
+import math
+import time
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from instruments import Grouping
+
+
+class Series:
+    """Append-only (timestamp, value) columns, at most one point per aligned `resolution`-second bucket.
+
+    Points are addressed by absolute index (trimmed + local index). Only the newest point can
+    still change (its bucket is open), so an absolute (lo, hi) range plus the newest point
+    identifies a slice exactly and makes a safe cache key.
+    """
+    __slots__ = ("ts", "values", "trimmed")
+
+    def __init__(self):
+        self.ts = array("d")
+        self.values = array("d")
+        self.trimmed = 0
+
+    def add(self, ts: float, value: float, resolution: float, max_points: int):
+        if self.ts:
+            last = self.ts[-1]
+            if ts < last: return
+            if ts // resolution == last // resolution:
+                # Same fixed bucket: keep the newest sample
+                self.values[-1] = value
+                self.ts[-1] = ts
+                return
+        self.ts.append(ts)
+        self.values.append(value)
+        if len(self.ts) > max_points + max_points // 4:
+            # Trim in chunks so the O(n) shift is amortized
+            drop = len(self.ts) - max_points
+            del self.ts[:drop]
+            del self.values[:drop]
+            self.trimmed += drop
+
+    def window(self, start: float, end: float) -> Tuple[int, int]:
+        lo, hi = bisect_left(self.ts, start), bisect_right(self.ts, end)
+        return self.trimmed + lo, self.trimmed + hi
+
+    def slice(self, lo: int, hi: int) -> Tuple[array, array]:
+        lo, hi = lo - self.trimmed, hi - self.trimmed
+        return self.ts[lo:hi], self.values[lo:hi]
+
+
+def lttb(ts, values, threshold: int) -> List[Tuple[float, float]]:
+    """Largest-Triangle-Three-Buckets downsampling (Steinarsson, 2013): keeps peaks and shape."""
+    n = len(ts)
+    if threshold >= n or threshold < 3:
+        return list(zip(ts, values))
+
+    out = [(ts[0], values[0])]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex
+        nxt_start = int(math.floor((i + 1) * every)) + 1
+        nxt_end = min(int(math.floor((i + 2) * every)) + 1, n)
+        span = nxt_end - nxt_start
+        avg_t = sum(ts[nxt_start:nxt_end]) / span
+        avg_v = sum(values[nxt_start:nxt_end]) / span
+
+        start = int(math.floor(i * every)) + 1
+        end = int(math.floor((i + 1) * every)) + 1
+        at, av = ts[a], values[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((at - avg_t) * (values[j] - av) - (at - ts[j]) * (avg_v - av))
+            if area > best_area:
+                best, best_area = j, area
+        out.append((ts[best], values[best]))
+        a = best
+    out.append((ts[-1], values[-1]))
+    return out
+
+
+class HistoryStore:
+    """In-memory per-symbol spread series and per-(symbol, exchange) rate series.
+
+    Written by the engine once per cycle, read by the dashboard's Flask threads. Memory is
+    bounded by HISTORY_MAX_POINTS per series at one point per HISTORY_RESOLUTION seconds
+    (defaults: 1440 x 60s = 24h). In memory only: older ranges and anything before a restart come
+    from the backfill Parquet store (backfill.py), not from here. Downsampled query results are cached per
+    (series, point range, resolution).
+    """
+
+    def __init__(self, grouping: Optional[Grouping] = None):
+        # Rates are filed under the same group name as spreads, so one symbol query covers every
+        # leg of the group; a leg whose instrument differs from the group name is "Venue INSTRUMENT"
+        self.grouping = grouping or Grouping()
+        self.resolution = float(os.getenv("HISTORY_RESOLUTION", 60))
+        self.max_points = int(os.getenv("HISTORY_MAX_POINTS", 1440))
+        self.cache_size = int(os.getenv("HISTORY_CACHE", 512))
+        self.spreads: Dict[str, Series] = {}
+        self.rates: Dict[str, Dict[str, Series]] = {}
+        self.cache: "OrderedDict[tuple, List[Tuple[float, float]]]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def record(self, rates, spreads: Optional[Dict[str, float]] = None, ts: Optional[float] = None):
+        """Fold one cycle: every rate, and `spreads` (symbol -> best spread, including those below
+        MIN_SPREAD, i.e. CycleResult.spreads) so spread series have no gaps."""
+        if not rates and not spreads: return
+        if ts is None: ts = max(r.timestamp for r in rates) if rates else time.time()
+        res, cap = self.resolution, self.max_points
+        name_of = self.grouping.name_of
+        with self.lock:
+            for r in rates:
+                symbol = name_of(r.symbol, r.instrument)
+                by_exchange = self.rates.get(symbol)
+                if by_exchange is None:
+                    by_exchange = self.rates[symbol] = {}
+                leg = r.exchange if r.symbol == symbol else f"{r.exchange} {r.symbol}"
+                series = by_exchange.get(leg)
+                if series is None:
+                    series = by_exchange[leg] = Series()
+                series.add(r.timestamp, r.rate, res, cap)
+            for symbol, spread in (spreads or {}).items():
+                series = self.spreads.get(symbol)
+                if series is None:
+                    series = self.spreads[symbol] = Series()
+                series.add(ts, spread, res, cap)
+
+    def _query(self, key: tuple, series: Optional[Series], start: float, end: float, points: int) -> List[Tuple[float, float]]:
+        with self.lock:
+            if series is None: return []
+            lo, hi = series.window(start, end)
+            # The newest point is rewritten while its bucket is open, so a range reaching it is keyed on its value too
+            tail = (series.ts[-1], series.values[-1]) if hi - series.trimmed == len(series.ts) and hi > lo else None
+            cache_key = key + (lo, hi, points, tail)
+            hit = self.cache.get(cache_key)
+            if hit is not None:
+                self.cache.move_to_end(cache_key)
+                return hit
+            ts, values = series.slice(lo, hi)
+        result = lttb(ts, values, points)
+        with self.lock:
+            self.cache[cache_key] = result
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return result
+
+    def spread(self, symbol: str, start: float, end: float, points: int) -> List[Tuple[float, float]]:
+        return self._query(("spread", symbol), self.spreads.get(symbol), start, end, points)
+
+    def rate(self, symbol: str, exchange: str, start: float, end: float, points: int) -> List[Tuple[float, float]]:
+        return self._query(("rate", symbol, exchange), self.rates.get(symbol, {}).get(exchange), start, end, points)
+
+    def retention(self) -> dict:
+        return {"resolution": self.resolution, "max_points": self.max_points,
+                "span": self.resolution * self.max_points, "persistent": False}
+
+    def exchanges(self, symbol: str) -> List[str]:
+        with self.lock:
+            return sorted(self.rates.get(symbol, ()))
+
+
+history = HistoryStore()
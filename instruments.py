@@ -0,0 +1,111 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+# Base-asset aliases applied when interning (venue naming quirks)
+BASE_ALIASES = {"XBT": "BTC"}
+# Quote suffixes recognised in legacy/plugin symbol strings, longest first
+KNOWN_QUOTES = ("FDUSD", "USDT", "USDC", "BUSD", "USD", "EUR")
+INVERSE_SUFFIX = "-INV"
+
+
+class Instrument(NamedTuple):
+    base: str
+    quote: str
+    margin: str  # 'linear' | 'inverse'
+
+    @property
+    def code(self) -> str:
+        # Stable string form, used as FundingRate.symbol and round-tripped by parse_code()
+        return f"{self.base}{self.quote}{INVERSE_SUFFIX if self.margin == 'inverse' else ''}"
+
+
+def parse_code(symbol: str) -> Instrument:
+    """'BTCUSDT' / 'BTC-USDC' / 'BTCUSD-INV' -> Instrument. Unknown quotes keep the whole string as base."""
+    sym = symbol.upper()
+    margin = "linear"
+    if sym.endswith(INVERSE_SUFFIX):
+        sym, margin = sym[:-len(INVERSE_SUFFIX)], "inverse"
+    sym = sym.replace('-', '').replace('_', '').replace('/', '')
+    for quote in KNOWN_QUOTES:
+        if sym.endswith(quote) and len(sym) > len(quote):
+            return Instrument(BASE_ALIASES.get(sym[:-len(quote)], sym[:-len(quote)]), quote, margin)
+    return Instrument(sym, "", margin)
+
+
+InstrumentKey = Union[str, Tuple[str, str, str]]
+
+class InstrumentIndex:
+    """Interns instruments to dense integer ids (process-wide, append-only, policy-free).
+
+    Adapters hand over either a (base, quote, margin) tuple or a symbol string; each distinct key
+    is resolved once, after which interning is a single dict lookup.
+    """
+
+    def __init__(self):
+        self.instruments: List[Instrument] = []
+        self.codes: List[str] = []
+        self._ids: Dict[Instrument, int] = {}
+        self._keys: Dict[InstrumentKey, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.instruments)
+
+    def intern(self, key: InstrumentKey) -> int:
+        iid = self._keys.get(key)
+        if iid is not None: return iid
+        if isinstance(key, str):
+            inst = parse_code(key)
+        else:
+            base, quote, margin = key
+            base = base.upper()
+            inst = Instrument(BASE_ALIASES.get(base, base), quote.upper(), margin)
+        iid = self._ids.get(inst)
+        if iid is None:
+            iid = self._ids[inst] = len(self.instruments)
+            self.instruments.append(inst)
+            self.codes.append(inst.code)
+        self._keys[key] = iid
+        return iid
+
+
+index = InstrumentIndex()
+
+
+class Grouping:
+    """Equivalence policy: which instruments are compared against each other.
+
+    `quote_equivalence` lists interchangeable quotes, '='-joined, one class per comma, e.g.
+    "USDT=USDC=USD,EUR"; a class is named after its first quote. With `margin_equivalence`,
+    inverse contracts share a group with linear ones. Group ids are computed once per instrument
+    id, so per-rate grouping is a list index.
+    """
+
+    def __init__(self, quote_equivalence: str = "USDT=USDC=USD", margin_equivalence: bool = True,
+                 instruments: InstrumentIndex = index):
+        self.index = instruments
+        self.margin_equivalence = margin_equivalence
+        self.quote_class: Dict[str, str] = {}
+        for cls in quote_equivalence.split(","):
+            quotes = [q.strip().upper() for q in cls.split("=") if q.strip()]
+            for q in quotes:
+                self.quote_class[q] = quotes[0]
+        self.names: List[str] = []
+        self._group_of: List[int] = []
+        self._groups: Dict[Tuple[str, str, str], int] = {}
+
+    def group(self, iid: int) -> int:
+        if iid >= len(self._group_of): self._extend()
+        return self._group_of[iid]
+
+    def _extend(self):
+        for inst in self.index.instruments[len(self._group_of):]:
+            quote = self.quote_class.get(inst.quote, inst.quote)
+            margin = "any" if self.margin_equivalence else inst.margin
+            key = (inst.base, quote, margin)
+            gid = self._groups.get(key)
+            if gid is None:
+                gid = self._groups[key] = len(self.names)
+                self.names.append(f"{inst.base}{quote}{INVERSE_SUFFIX if margin == 'inverse' else ''}")
+            self._group_of.append(gid)
+
+    def name_of(self, symbol: str, iid: Optional[int] = None) -> str:
+        return self.names[self.group(iid if iid is not None else self.index.intern(symbol))]
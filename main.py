@@ -1,150 +1,198 @@
 import asyncio
+import logging
 import os
 import threading
 import signal
 import sys
 import time
-from collections import defaultdict
-from typing import List
-from dotenv import load_dotenv
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich import box
+from typing import Dict, List, Optional
 
-from models import Opportunity
-from fetcher import AsyncFetcher
-from web_dashboard import start_flask_app, update_dashboard_data
-from notifier import TelegramNotifier
+from models import FundingRate, Opportunity
+from engine import ArbitrageEngine, EngineConfig
+from tracer import tracer
+from feed import FeedServer
+from snapshot import SnapshotStore
+from scheduler import SettlementScheduler
 
-load_dotenv()
-console = Console()
-
-USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-FETCH_INTERVAL = int(os.getenv("FETCH_INTERVAL", 0))
-MIN_SPREAD = float(os.getenv("MIN_SPREAD", 0.025))
+logger = logging.getLogger("Main")
+logger.setLevel(logging.INFO)
 
 class ArbitrageBot:
-    def __init__(self):
-        self.fetcher = AsyncFetcher(USER_AGENT)
+    """The engine plus its outputs: dashboard, Telegram, terminal, binary feed and snapshots."""
+
+    def __init__(self, headless: bool = False, config: EngineConfig = None):
+        # Output layers are imported here so `import engine` stays free of Flask / rich
+        from notifier import TelegramNotifier
+        from console_ui import CycleStats, LiveDashboard, HeadlessReporter
+        from web_dashboard import update_dashboard_data
+        from history import history
+        self._cycle_stats, self._update_dashboard, self._history = CycleStats, update_dashboard_data, history
+        # CLUSTER_LISTEN=host:port: rates arrive from remote fetch nodes (see cluster.py)
+        from cluster import ClusterAggregator
+        self.engine = ArbitrageEngine(config, ClusterAggregator.from_env())
+        self._history.grouping = self.engine.grouping
         self.notifier = TelegramNotifier()
+        self.ui = HeadlessReporter() if headless else LiveDashboard()
+        # Optional low-latency binary feed for local consumers (see feed_client.py)
+        feed_path = os.getenv("FEED_SOCKET")
+        self.feed = FeedServer(feed_path) if feed_path else None
+        # Warm restart: last checkpoint is restored before the first live cycle
+        self.snapshots = SnapshotStore()
+        # Settlement-aware cadence, opt-in (default: constant FETCH_INTERVAL)
+        self.scheduler = SettlementScheduler() if os.getenv("POLL_SCHEDULE", "0") == "1" else None
         self.running = True
+        self.latest_rates = []
         self.latest_opportunities = []
-
-    def calculate_arbitrage(self, rates: List) -> List[Opportunity]:
-
-        grouped = defaultdict(list)
-        for r in rates:
-            # Normalize symbol
-            norm_sym = r.symbol.replace('-', '').replace('_', '').replace('/', '').upper()
-            if norm_sym.endswith('USDT'):
-                grouped[norm_sym].append(r)
-
-        opps = []
-        for symbol, entries in grouped.items():
-            # Remove duplicate exchanges
-            unique_entries = {e.exchange: e for e in entries}.values()
-            entries = list(unique_entries)
-            
-            if len(entries) < 2: continue
-            
-            # Sort: Lowest Rate (Long) -> Highest Rate (Short)
-            entries.sort(key=lambda x: x.rate)
-            
-            long = entries[0]
-            short = entries[-1]
-            
-            # Spread Calculation
-            spread = short.rate - long.rate
-            
-            if spread >= MIN_SPREAD:
-                opps.append(Opportunity(
-                    symbol=symbol,
-                    long_exchange=long.exchange,
-                    long_rate=long.rate,
-                    short_exchange=short.exchange,
-                    short_rate=short.rate,
-                    spread=spread,
-                    annualized_spread=spread * 3 * 365
-                ))
-        
-        return sorted(opps, key=lambda x: x.spread, reverse=True)
+        self.total_pairs = 0
 
     async def run_loop(self):
-        await self.fetcher.start_session()
-        console.print(Panel.fit("[bold green]🚀 Arbitrage Engine Active[/bold green]", border_style="green"))
+        await self.engine.start()
+        await self.notifier.start()
+        if self.feed: await self.feed.start()
+        self._restore()
+        self.ui.start()
         
         while self.running:
-            start_time = time.perf_counter()
-            
-            # 1. Fetch
-            all_rates = await self.fetcher.fetch_all()
-            
-            # 2. Stats
-            total_pairs = len(set(r.symbol for r in all_rates))
-            
-            # 3. Calculate
-            self.latest_opportunities = self.calculate_arbitrage(all_rates)
+            tracer.begin_cycle()
+            with tracer.span("cycle"):
+                elapsed = await self._cycle()
+            tracer.end_cycle()
+            if self.snapshots.due():
+                self.snapshots.save_soon(self._export_state())
             
-            # 4. Notify & Web
-            update_dashboard_data(self.latest_opportunities, total_pairs)
-            await self.notifier.process(self.latest_opportunities)
-            
-            elapsed = time.perf_counter() - start_time
-            
-            # 5. Output
-            self._print_dashboard(len(all_rates), total_pairs, len(self.latest_opportunities), elapsed)
-            
-            sleep_time = max(0, FETCH_INTERVAL - elapsed)
+            if self.scheduler:
+                sleep_time, _ = self.scheduler.next_delay(time.time(), elapsed)
+            else:
+                sleep_time = max(0, self.engine.config.fetch_interval - elapsed)
             await asyncio.sleep(sleep_time)
 
-    def _print_dashboard(self, total_rates, total_pairs, opp_count, latency):
-        summary = Table(box=box.SIMPLE, show_header=False)
-        summary.add_column("Key", style="cyan")
-        summary.add_column("Val", style="bold white")
-        summary.add_row("⏱️ Latency", f"{latency:.3f}s")
-        summary.add_row("📡 Points", f"{total_rates}")
-        summary.add_row("🔄 Pairs", f"{total_pairs}")
+    async def _cycle(self) -> float:
+        start_time = time.perf_counter()
+        
+        # 1. Fetch + rank (pipelined mode publishes a provisional ranking as each venue lands)
+        result = await self.engine.scan_once(
+            lambda opps, pairs: self._publish(None, opps, pairs, {"provisional": True}))
+        self.latest_rates, self.latest_opportunities, self.total_pairs = result.rates, result.opportunities, result.total_pairs
+        schedule = {}
+        if self.scheduler:
+            now = time.time()
+            self.scheduler.scanned(now)
+            self.scheduler.observe(result.opportunities, now)
+            schedule = self.scheduler.metrics(now)
         
-        # Display Table with REAL spread
-        opp_table = Table(title="🏆 TOP OPPORTUNITIES (Per Round)", box=box.ROUNDED)
-        opp_table.add_column("#", style="yellow")
-        opp_table.add_column("Pair", style="bold white")
-        opp_table.add_column("Spread", justify="right", style="bold green")
-        opp_table.add_column("Long (Buy)", style="blue")
-        opp_table.add_column("Short (Sell)", style="red")
+        # 2. Publish, Notify & Web
+        self._publish(result.rates, result.opportunities, result.total_pairs, {
+            "provisional": False,
+            "cycle_latency": time.perf_counter() - start_time,
+            "time_to_first_opportunity": result.ttfo,
+            "first_cycle_latency": self.engine.first_cycle_latency,
+            **schedule,
+            **self._endpoint_metrics(),
+            **self._capture_metrics(),
+            "freshness": self.engine.freshness.report(),
+        }, result.spreads)
+        with tracer.span("notify"):
+            await self.notifier.process(result.opportunities, result.spreads, result.changes)
         
-        for i, o in enumerate(self.latest_opportunities[:10], 1):
-            opp_table.add_row(
-                str(i), 
-                o.symbol, 
-                f"{o.spread:.4f}%", 
-                f"{o.long_exchange} ({o.long_rate:.4f}%)", 
-                f"{o.short_exchange} ({o.short_rate:.4f}%)"
-            )
+        elapsed = time.perf_counter() - start_time
+        
+        # 3. Output (terminal redraws at its own capped rate; headless logs periodic summaries)
+        with tracer.span("render"):
+            self.ui.update(self._cycle_stats(len(result.rates), result.total_pairs, elapsed, result.opportunities, result.report, result.ttfo))
+        return elapsed
+
+    def _endpoint_metrics(self) -> dict:
+        # Mirror latency/health per venue (only AsyncFetcher has mirrors; a cluster aggregator has none)
+        report = getattr(self.engine.fetcher, "endpoint_report", None)
+        return {"endpoints": report()} if report else {}
+
+    def _capture_metrics(self) -> dict:
+        capture = getattr(self.engine.fetcher, "capture", None)
+        if not capture: return {}
+        return {"capture": {"records": capture.records, "dropped": capture.dropped, "bytes_out": capture.bytes_out}}
 
-        console.print(Panel(summary, title="Status"))
-        if self.latest_opportunities:
-            console.print(opp_table)
+    def _publish(self, rates, opportunities: List[Opportunity], total_pairs: int, metrics: dict,
+                 spreads: Optional[Dict[str, float]] = None):
+        if self.feed:
+            with tracer.span("feed.publish"):
+                self.feed.publish(rates, opportunities)
+        with tracer.span("update_dashboard"):
+            self._update_dashboard(opportunities, total_pairs, metrics)
+        if rates is not None:
+            with tracer.span("history"):
+                self._history.record(rates, spreads)
+
+    def _export_state(self) -> dict:
+        # Plain builtins only: the snapshot loader refuses to import classes
+        return {
+            "saved_at": time.time(),
+            "rates": [(r.exchange, r.symbol, r.rate, r.timestamp, r.mark_price, r.index_price, r.next_funding_time,
+                       r.event_time) for r in self.latest_rates],
+            "opportunities": [o.model_dump() for o in self.latest_opportunities],
+            "total_pairs": self.total_pairs,
+            "report": dict(self.engine.fetcher.last_report),
+            "alerts": self.notifier.alerts.export_state(),
+            "tier_alerts": {t: e.export_state() for t, e in self.notifier.tier_alerts.items()},
+            "stats": self.engine.stats.export_state(),
+        }
+
+    def _restore(self):
+        start = time.perf_counter()
+        state = self.snapshots.load()
+        if not state: return
+        try:
+            fields = ("exchange", "symbol", "rate", "timestamp", "mark_price", "index_price", "next_funding_time", "event_time")
+            rates = [FundingRate.model_construct(**dict(zip(fields, row))) for row in state["rates"]]
+            opps = [Opportunity.model_construct(**o) for o in state["opportunities"]]
+            self.notifier.alerts.load_state(state["alerts"])
+            for min_spread, alerts in state.get("tier_alerts", {}).items():
+                self.notifier.tier_engine(min_spread).load_state(alerts)
+            self.engine.stats.load_state(state["stats"])
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Snapshot incompatible ({e}), starting cold")
+            return
+        self.latest_rates, self.latest_opportunities, self.total_pairs = rates, opps, state.get("total_pairs", 0)
+        self.engine.fetcher.last_report = state.get("report", {})
+        age = time.time() - state.get("saved_at", 0)
+        self._publish(rates, opps, self.total_pairs, {"restored": True, "snapshot_age": age})
+        logger.info(f"Restored {len(rates)} rates / {len(opps)} opportunities from {self.snapshots.path} "
+                    f"({age:.0f}s old) in {(time.perf_counter() - start) * 1000:.1f}ms")
 
     async def close(self):
-        await self.fetcher.close()
+        if self.latest_rates: await self.snapshots.flush(self._export_state())
+        self.ui.stop()
+        await self.notifier.close()
+        if self.feed: await self.feed.close()
+        await self.engine.close()
 
 def signal_handler(sig, frame):
     print("\n[INFO] Shutting down...")
     sys.exit(0)
 
-async def main():
-    bot = ArbitrageBot()
+async def main(headless: bool = False):
+    bot = ArbitrageBot(headless)
     try:
         await bot.run_loop()
     finally:
         await bot.close()
 
 if __name__ == "__main__":
+    from dotenv import load_dotenv
+    from console_ui import is_headless, setup_logging, stop_logging
+    from web_dashboard import start_flask_app
+    load_dotenv()
+    
+    headless = is_headless()
+    setup_logging(headless)
+    
     # Register Ctrl+C handler
     signal.signal(signal.SIGINT, signal_handler)
     
+    # Tracing: `kill -USR1 <pid>` captures the next TRACE_TRIGGER_CYCLES cycles
+    tracer.configure_from_env()
+    if hasattr(signal, 'SIGUSR1'):
+        signal.signal(signal.SIGUSR1, lambda sig, frame: tracer.trigger())
+    
     # Start Flask
     flask_thread = threading.Thread(target=start_flask_app, daemon=True)
     flask_thread.start()
@@ -154,6 +202,8 @@ if __name__ == "__main__":
         if sys.platform != 'win32':
             import uvloop
             uvloop.install()
-        asyncio.run(main())
+        asyncio.run(main(headless))
     except KeyboardInterrupt:
         pass
+    finally:
+        stop_logging()
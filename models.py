@@ -6,6 +6,12 @@ class FundingRate(BaseModel):
     symbol: str
     rate: float
     timestamp: float
+    # Extracted from the same payload when the venue provides them (no extra requests)
+    mark_price: Optional[float] = None
+    index_price: Optional[float] = None
+    next_funding_time: Optional[float] = None   # unix seconds
+    instrument: Optional[int] = None            # instruments.index id, set by adapters.parse
+    event_time: Optional[float] = None          # venue's own timestamp for the row/payload (venue clock)
 
 class Opportunity(BaseModel):
     symbol: str
@@ -16,5 +22,40 @@ class Opportunity(BaseModel):
     spread: float
     annualized_spread: float
 
+    # Streaming persistence statistics for this (symbol, long, short) route
+    spread_ewma: Optional[float] = None
+    spread_mean: Optional[float] = None
+    spread_std: Optional[float] = None
+    observations: int = 0
+    time_above: float = 0.0          # seconds continuously above the stats threshold
+    periods_persisted: int = 0       # funding settlements crossed while persisting
+
+    # Settlement-aware signals (from mark prices / next funding times; grid fallback when unknown)
+    basis: Optional[float] = None               # (short mark - long mark) / long mark, in %
+    time_to_settlement: Optional[float] = None  # seconds until the first leg settles
+    receivable: Optional[float] = None          # net funding (%) collected at that settlement
+
+    # Each leg's own instrument (e.g. BTCUSDC vs BTCUSD-INV) when the group spans quotes/margins
+    long_symbol: Optional[str] = None
+    short_symbol: Optional[str] = None
+
+    # Freshness: skew-corrected age (s) of the older leg; stale when above STALE_MAX_AGE
+    max_leg_age: Optional[float] = None
+    stale: bool = False
+
+    # Venue plus its instrument when that differs from the group symbol, e.g. "Binance BTCUSDC",
+    # so two legs on one venue (USDT vs USDC perp) stay distinguishable wherever routes are shown
+    @property
+    def long_leg(self) -> str:
+        return _leg(self.long_exchange, self.long_symbol, self.symbol)
+
+    @property
+    def short_leg(self) -> str:
+        return _leg(self.short_exchange, self.short_symbol, self.symbol)
+
     class Config:
         frozen = True  # Immutable for thread safety
+
+
+def _leg(exchange: str, instrument: Optional[str], symbol: str) -> str:
+    return f"{exchange} {instrument}" if instrument and instrument != symbol else exchange
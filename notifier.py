@@ -2,14 +2,36 @@ import os
 import asyncio
 import aiohttp
 import logging
-from datetime import datetime, timedelta
-from typing import List
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
 from models import Opportunity
+from alerts import AlertEngine, AlertEvent
+from subscriptions import SubscriptionStore
+from ratelimit import AsyncRateLimiter
+from tracer import tracer
 
 # Configure Logging
 logger = logging.getLogger("Notifier")
 logger.setLevel(logging.INFO)
 
+TELEGRAM_MAX_LEN = 4096
+
+def split_message(message: str, limit: int = TELEGRAM_MAX_LEN) -> List[str]:
+    # Split on line boundaries so Markdown entities (which never span lines here) stay intact
+    chunks, current = [], ""
+    for line in message.split("\n"):
+        while len(line) > limit:
+            if current: chunks.append(current); current = ""
+            chunks.append(line[:limit]); line = line[limit:]
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) > limit:
+            chunks.append(current)
+            candidate = line
+        current = candidate
+    if current: chunks.append(current)
+    return chunks
+
 class TelegramNotifier:
     def __init__(self):
         self.token = os.getenv("TELEGRAM_BOT_TOKEN")
@@ -18,78 +40,185 @@ class TelegramNotifier:
         chat_ids_str = os.getenv("TELEGRAM_CHAT_IDS", "")
         self.chat_ids = [cid.strip() for cid in chat_ids_str.replace(" ", ",").split(",") if cid.strip()]
         
-        self.last_sent = datetime.min
-        self.interval = timedelta(hours=1) # Send every 1 hour
-        self.top_count = 10
+        # Threshold-crossing alerts with per-symbol hysteresis and cooldown
+        self.alerts = AlertEngine()
+        # Per-chat watchlists (subscriptions.py); chats without one get the full digest
+        self.subscriptions = SubscriptionStore()
+        # Alert state per subscriber min spread above ALERT_SPREAD, so each tier gets its own crossing
+        self.tier_alerts: Dict[float, AlertEngine] = {}
+
+        # Delivery: one bounded queue and worker per chat over one pooled session, so a chat's
+        # rate limit, timeouts and retries never hold up the others
+        self.queue_size = int(os.getenv("NOTIFY_QUEUE_SIZE", 100))
+        self.max_retries = int(os.getenv("NOTIFY_RETRIES", 3))
+        self.global_limit = AsyncRateLimiter(float(os.getenv("TELEGRAM_GLOBAL_RATE", 30)))     # msgs/sec, all chats
+        self.chat_rate = float(os.getenv("TELEGRAM_CHAT_RATE", 1))                             # msgs/sec, per chat
+        self.chat_limits = {}
+        self.queues: Dict[str, asyncio.Queue] = {}
+        self.workers: Dict[str, asyncio.Task] = {}
+        self.session = None
+
+    async def start(self):
+        if self.session: return
+        # SSL=False to bypass local network restriction/certificate errors
+        connector = aiohttp.TCPConnector(ssl=False, limit=self.queue_size, keepalive_timeout=60)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=15))
+
+    async def close(self):
+        workers, self.workers, self.queues = list(self.workers.values()), {}, {}
+        for worker in workers: worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        if self.session:
+            await self.session.close()
+            self.session = None
 
-    async def send_message(self, message: str):
-        if not self.token or not self.chat_ids: 
+    async def send_message(self, message: str, chat_ids: Optional[List[str]] = None):
+        # Never blocks the engine: enqueue per chat and return, dropping that chat's oldest alert if full
+        targets = chat_ids if chat_ids is not None else self.chat_ids
+        if not self.token or not targets: 
             return
-        
+        if self.session is None: await self.start()
+        chunks = split_message(message)
+        for chat_id in targets:
+            queue = self.queues.get(chat_id)
+            if queue is None:
+                queue = self.queues[chat_id] = asyncio.Queue(maxsize=self.queue_size)
+                self.workers[chat_id] = asyncio.create_task(self._consume(chat_id, queue), name=f"telegram-{chat_id}")
+            try:
+                queue.put_nowait(chunks)
+            except asyncio.QueueFull:
+                queue.get_nowait()
+                queue.put_nowait(chunks)
+                logger.warning(f"Telegram queue for {chat_id} full, dropped oldest alert")
+
+    async def _consume(self, chat_id: str, queue: asyncio.Queue):
+        with tracer.lane(f"Telegram {chat_id}"):
+            while True:
+                chunks = await queue.get()
+                with tracer.span("telegram.send", chat=chat_id, chunks=len(chunks)):
+                    # Chunks within one chat stay ordered; other chats proceed on their own workers
+                    await self._deliver(chat_id, chunks)
+                queue.task_done()
+
+    async def _deliver(self, chat_id: str, chunks: List[str]):
+        limiter = self.chat_limits.get(chat_id)
+        if limiter is None:
+            limiter = self.chat_limits[chat_id] = AsyncRateLimiter(self.chat_rate, burst=1)
+        for chunk in chunks:
+            if not await self._post(chat_id, chunk, limiter): return
+
+    async def _post(self, chat_id: str, text: str, limiter: AsyncRateLimiter) -> bool:
         url = f"https://api.telegram.org/bot{self.token}/sendMessage"
-        
-        # SSL=False to bypass local network restriction/certificate errors
-        connector = aiohttp.TCPConnector(ssl=False)
-        
-        async with aiohttp.ClientSession(connector=connector) as session:
-            for chat_id in self.chat_ids:
-                payload = {
-                    'chat_id': chat_id,
-                    'text': message,
-                    'parse_mode': 'Markdown',
-                    'disable_web_page_preview': True
-                }
-                try:
-                    async with session.post(url, json=payload) as resp:
-                        if resp.status != 200:
-                            err_text = await resp.text()
-                            logger.error(f"Telegram Failed ({resp.status}): {err_text}")
-                except Exception as e:
-                    logger.error(f"Telegram Connection Error: {e}")
-
-    async def process(self, opportunities: List[Opportunity]):
-        if not opportunities: return
-        
-        now = datetime.now()
-        # Check if 1 hour has passed since last alert
-        if now - self.last_sent < self.interval:
+        payload = {
+            'chat_id': chat_id,
+            'text': text,
+            'parse_mode': 'Markdown',
+            'disable_web_page_preview': True
+        }
+        for attempt in range(self.max_retries + 1):
+            await limiter.acquire()
+            await self.global_limit.acquire()
+            backoff = 2 ** attempt
+            try:
+                async with self.session.post(url, json=payload) as resp:
+                    if resp.status == 200:
+                        return True
+                    err_text = await resp.text()
+                    if resp.status == 429:
+                        # Telegram tells us exactly how long to wait; the chat's bucket enforces it
+                        try: retry_after = float((await resp.json(content_type=None))["parameters"]["retry_after"])
+                        except Exception: retry_after = backoff
+                        limiter.penalize(retry_after)
+                        continue
+                    if resp.status < 500:
+                        logger.error(f"Telegram Failed ({resp.status}): {err_text}")
+                        return False
+                    logger.warning(f"Telegram retry {attempt + 1}/{self.max_retries} ({resp.status})")
+            except Exception as e:
+                logger.warning(f"Telegram Connection Error: {e}")
+            if attempt < self.max_retries:
+                await asyncio.sleep(backoff)
+        logger.error(f"Telegram delivery to {chat_id} gave up after {self.max_retries} retries")
+        return False
+
+    async def process(self, opportunities: List[Opportunity], spreads: Optional[Dict[str, float]] = None,
+                      changes: Optional[Dict[str, Optional[Opportunity]]] = None):
+        # Event-driven: only symbols that newly crossed or widened since last cycle are alerted.
+        # `changes` (CycleResult.changes) limits the work to symbols whose legs moved; without it
+        # every opportunity (and every symbol with alert state) is re-checked. Opportunities flagged stale (see STALE_MAX_AGE) never
+        # alert (their spread still counts through `spreads`, so they hold rather than disarm)
+        now = time.time()
+        if changes is None:
+            changes = dict.fromkeys(set(self.alerts.state).union(*(e.state for e in self.tier_alerts.values())))
+            changes.update((o.symbol, o) for o in opportunities)
+        fresh = {sym: opp if opp is not None and not opp.stale else None for sym, opp in changes.items()}
+        events = self.alerts.evaluate(fresh, now, spreads)
+        subs = self.subscriptions
+        subs.refresh()
+        if not subs:
+            if events: await self.send_message(self.format_events(events, len(opportunities)))
             return
-        
+
+        # Chats sharing the same event list share one formatted message and one queue item
+        with tracer.span("route", events=len(events), subscribers=len(subs)):
+            groups = {}
+            live = set()
+            for min_spread, chats in subs.tiers.items():
+                if min_spread <= self.alerts.threshold:
+                    tier_events = events
+                else:
+                    live.add(min_spread)
+                    tier_events = self.tier_engine(min_spread).evaluate(fresh, now, spreads)
+                if not tier_events: continue
+                for chat, chat_events in subs.route(tier_events).items():
+                    if chat in chats:
+                        groups.setdefault(tuple(map(id, chat_events)), (chat_events, []))[1].append(chat)
+            for min_spread in self.tier_alerts.keys() - live:
+                del self.tier_alerts[min_spread]
+            everyone = [chat for chat in self.chat_ids if chat not in subs]
+            if everyone and events:
+                groups.setdefault(tuple(map(id, events)), (events, []))[1].extend(everyone)
+        for chat_events, chats in groups.values():
+            await self.send_message(self.format_events(chat_events, len(opportunities)), chats)
+
+    def tier_engine(self, min_spread: float) -> AlertEngine:
+        engine = self.tier_alerts.get(min_spread)
+        if engine is None:
+            engine = self.tier_alerts[min_spread] = AlertEngine(min_spread)
+        return engine
+
+    def format_events(self, events: List[AlertEvent], total: int) -> str:
+        now = datetime.now(timezone.utc)
+
         # 1. Header with Stats
-        top_spread = opportunities[0].spread
+        top_spread = events[0].opportunity.spread
         msg = f"⚡ *ARB SIGNAL DETECTED* ⚡\n"
         msg += f"───────────────────\n"
-        msg += f"🕒 `{now.strftime('%H:%M UTC')}`\n"
+        msg += f"🕒 `{now.strftime('%H:%M:%S UTC')}`\n"
         msg += f"💎 Best Spread: `+{top_spread:.4f}%`\n"
-        msg += f"📊 Opportunities: `{len(opportunities)}`\n\n"
+        msg += f"📊 Opportunities: `{total}`\n"
+
+        # 2. List New / Widened Spreads
+        for event in events:
+            opp = event.opportunity
+            if event.kind == "new":
+                tag = "🆕"
+                change = ""
+            else:
+                tag = "📈"
+                change = f" (from `+{event.previous_spread:.4f}%`)"
 
-        # 2. List Top Opportunities
-        msg += f"*🏆 TOP {self.top_count} PER ROUND (8H)*\n"
-        
-        for i, opp in enumerate(opportunities[:self.top_count], 1):
-            # Rank Emojis
-            if i == 1: rank = "🥇"
-            elif i == 2: rank = "🥈"
-            elif i == 3: rank = "🥉"
-            else: rank = f"#{i}"
-
-            # Calculate Spread
-            spread_str = f"+{opp.spread:.4f}%"
-            
             # Format Rates
             # Long: We want Negative (Receives). 
             l_val = f"{opp.long_rate:+.4f}%"
             # Short: We want Positive (Receives).
             s_val = f"{opp.short_rate:+.4f}%"
 
-            msg += f"\n{rank} *{opp.symbol}* │ `{spread_str}`\n"
-            msg += f"       L: {opp.long_exchange} (`{l_val}`)\n"
-            msg += f"       S: {opp.short_exchange} (`{s_val}`)\n"
+            msg += f"\n{tag} *{opp.symbol}* │ `+{opp.spread:.4f}%`{change}\n"
+            msg += f"       L: {opp.long_leg} (`{l_val}`)\n"
+            msg += f"       S: {opp.short_leg} (`{s_val}`)\n"
 
         # 3. Footer
         msg += f"\n───────────────────\n"
         msg += f"🖥️ [Live Command Center](http://51.20.6.77/bot/)"
-        
-        # Send and update timer
-        await self.send_message(msg)
-        self.last_sent = now
+        return msg
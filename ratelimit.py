@@ -0,0 +1,36 @@
+import asyncio
+import time
+
+
+class AsyncRateLimiter:
+    """Token bucket: at most `rate` acquisitions per `period` seconds, bursting up to `burst`."""
+
+    def __init__(self, rate: float, period: float = 1.0, burst: float = None):
+        self.rate = rate / period
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def penalize(self, seconds: float):
+        # Server asked us to back off (e.g. HTTP 429 retry_after): drain the bucket for that long
+        self.tokens = min(self.tokens, 0) - seconds * self.rate
+        self.updated = time.monotonic()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
@@ -0,0 +1,116 @@
+"""One-shot scan: fetch once, rank spreads, write machine-readable output, exit.
+
+    python scan.py                                   # JSON Lines to stdout
+    python scan.py --venues Binance,Bybit,OKX --symbols BTCUSDT,ETHUSDT --format csv
+    python scan.py --format arrow --output opps.arrow --deadline 5
+    python scan.py --rates --format csv              # raw per-venue rates instead of opportunities
+
+No dashboard, terminal UI or notifier is started. The run summary (including seconds from
+process start to output) goes to stderr.
+"""
+import os
+import sys
+import csv
+import json
+import time
+import asyncio
+import argparse
+import logging
+from typing import List, Optional
+
+# STARTED is measured from process start (engine.process_age), so interpreter startup counts too
+from engine import STARTED, ArbitrageEngine, EngineConfig
+
+logger = logging.getLogger("Scan")
+logger.setLevel(logging.INFO)
+
+OPPORTUNITY_FIELDS = ("symbol", "long_exchange", "long_rate", "short_exchange", "short_rate", "spread", "annualized_spread",
+                      "basis", "time_to_settlement", "receivable", "long_symbol", "short_symbol", "max_leg_age", "stale")
+RATE_FIELDS = ("exchange", "symbol", "rate", "timestamp", "mark_price", "index_price", "next_funding_time", "event_time")
+
+
+def _rows(items, fields):
+    return [{f: getattr(item, f) for f in fields} for item in items]
+
+def write_jsonl(out, rows: List[dict], fields):
+    for row in rows:
+        out.write(json.dumps(row, separators=(",", ":")) + "\n")
+
+def write_csv(out, rows: List[dict], fields):
+    writer = csv.DictWriter(out, fieldnames=fields, lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(rows)
+
+def write_arrow(out, rows: List[dict], fields):
+    try:
+        import pyarrow as pa
+    except ImportError:
+        sys.exit("--format arrow needs pyarrow: pip install pyarrow")
+    table = pa.table({f: [row[f] for row in rows] for f in fields})
+    with pa.ipc.new_stream(out, table.schema) as writer:
+        writer.write_table(table)
+
+WRITERS = {"jsonl": (write_jsonl, "w"), "csv": (write_csv, "w"), "arrow": (write_arrow, "wb")}
+
+
+async def scan(config: EngineConfig, symbols: Optional[set], deadline: float):
+    """Fetch every configured venue once; whatever has landed when the deadline hits is used."""
+    rates = []
+    async with ArbitrageEngine(config) as engine:
+        # A symbol matches its own instrument (BTCUSDC) or its whole group (BTCUSDT covers BTCUSDC, BTCUSD-INV)
+        wanted = lambda r: r.symbol in symbols or engine.grouping.name_of(r.symbol, r.instrument) in symbols
+        async def collect():
+            async for _, res in engine.fetcher.iter_all():
+                rates.extend(r for r in res if symbols is None or wanted(r))
+        try:
+            await asyncio.wait_for(collect(), deadline)
+        except asyncio.TimeoutError:
+            logger.warning(f"Deadline of {deadline}s hit, using partial results")
+        report = engine.fetcher.last_report
+        opps = engine.calculate_arbitrage(rates)
+    return rates, opps, report
+
+
+async def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run one funding-rate arbitrage scan and print the results")
+    parser.add_argument("--venues", help="comma-separated venues; only these adapters run (default: EXCHANGES config)")
+    parser.add_argument("--symbols", help="comma-separated instruments or pair groups, e.g. BTCUSDT,ETHUSDC")
+    parser.add_argument("--min-spread", type=float, help="minimum spread in %% (default: MIN_SPREAD)")
+    parser.add_argument("--format", choices=WRITERS, default="jsonl")
+    parser.add_argument("--output", default="-", help="file path, or - for stdout")
+    parser.add_argument("--deadline", type=float, default=float(os.getenv("SCAN_DEADLINE", 20)),
+                        help="global deadline in seconds for the whole fetch")
+    parser.add_argument("--rates", action="store_true", help="emit the raw rates instead of opportunities")
+    args = parser.parse_args(argv)
+
+    config = EngineConfig.from_env()
+    if args.venues: config.exchanges = [v.strip() for v in args.venues.split(",") if v.strip()]
+    if args.min_spread is not None: config.min_spread = args.min_spread
+    symbols = {s.strip().upper() for s in args.symbols.split(",") if s.strip()} if args.symbols else None
+
+    rates, opps, report = await scan(config, symbols, args.deadline)
+    fields = RATE_FIELDS if args.rates else OPPORTUNITY_FIELDS
+    rows = _rows(rates if args.rates else opps, fields)
+
+    write, mode = WRITERS[args.format]
+    if args.output == "-":
+        write(sys.stdout.buffer if mode == "wb" else sys.stdout, rows, fields)
+        sys.stdout.flush()
+    else:
+        with open(args.output, mode, newline="" if mode == "w" else None) as f:
+            write(f, rows, fields)
+
+    failed = sorted(name for name, n in report.items() if not isinstance(n, int) or n == 0)
+    logger.info(f"{len(opps)} opportunities from {len(rates)} rates across {len(report) - len(failed)} venues; "
+                f"output after {time.perf_counter() - STARTED:.3f}s from process start"
+                + (f"; no data from {', '.join(failed)}" if failed else ""))
+    return 0 if rates else 1
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    try:
+        sys.exit(asyncio.run(main()))
+    except KeyboardInterrupt:
+        sys.exit(130)
@@ -0,0 +1,87 @@
+import os
+import bisect
+import logging
+from typing import List, Optional, Tuple
+
+from models import Opportunity
+from spread_stats import FUNDING_PERIOD
+
+logger = logging.getLogger("Scheduler")
+logger.setLevel(logging.INFO)
+
+
+class SettlementScheduler:
+    """Poll cadence driven by upcoming funding settlements.
+
+    Polls every POLL_SLOW seconds (default: FETCH_INTERVAL, else 30) mid-period, every POLL_FAST seconds within POLL_BURST_WINDOW
+    seconds of a settlement, and lands one scan exactly POLL_SETTLE_DELAY seconds after each
+    settlement (venues need a moment to roll their next rate). Settlement times come from the
+    ranked opportunities' legs (venue next funding time, else the 00/08/16 UTC grid), so the
+    burst follows whichever instruments are actually being watched.
+    """
+
+    def __init__(self, slow: Optional[float] = None, fast: Optional[float] = None,
+                 window: Optional[float] = None, settle_delay: Optional[float] = None):
+        self.slow = slow if slow is not None else (
+            float(os.getenv("POLL_SLOW") or 0) or float(os.getenv("FETCH_INTERVAL") or 0) or 30.0)
+        self.fast = fast if fast is not None else float(os.getenv("POLL_FAST", 1))
+        self.window = window if window is not None else float(os.getenv("POLL_BURST_WINDOW", 300))
+        self.settle_delay = settle_delay if settle_delay is not None else float(os.getenv("POLL_SETTLE_DELAY", 2))
+        self.settlements: List[float] = []   # upcoming settlement times, sorted, whole seconds
+        self.pending: Optional[float] = None  # settlement whose post-settlement scan is still owed
+        self.mode = "slow"
+        self.interval = self.slow
+        self.settlement_scans = 0
+        self.last_settlement: Optional[float] = None
+
+    def observe(self, opportunities: List[Opportunity], now: float):
+        """Refresh upcoming settlements from a finished ranking (ranked at roughly `now`)."""
+        self._settle(now)
+        times = {round(now + o.time_to_settlement) for o in opportunities if o.time_to_settlement is not None}
+        times.add((now // FUNDING_PERIOD + 1) * FUNDING_PERIOD)
+        self.settlements = sorted(times)
+
+    def next_delay(self, now: float, elapsed: float = 0.0) -> Tuple[float, str]:
+        """Seconds to sleep before the next scan, and the mode that chose it."""
+        self._settle(now)
+        if self.pending is not None:
+            self.mode, self.interval = "settlement", 0.0
+            return max(0.0, self.pending + self.settle_delay - now), self.mode
+
+        upcoming = self.settlements[0] if self.settlements else (now // FUNDING_PERIOD + 1) * FUNDING_PERIOD
+        until = upcoming - now
+        if until <= self.window:
+            self.mode, self.interval = "burst", self.fast
+            delay = self.fast - elapsed
+        else:
+            # Wake up at the start of the burst window even if mid-interval
+            self.mode, self.interval = "slow", self.slow
+            delay = min(self.slow - elapsed, until - self.window)
+        # Never sleep through a settlement
+        return max(0.0, min(delay, until)), self.mode
+
+    def _settle(self, now: float):
+        # A settlement passed since the last ranking: owe one scan right after it
+        passed = bisect.bisect_right(self.settlements, now)
+        if passed:
+            self.pending = self.settlements[passed - 1]
+            del self.settlements[:passed]
+
+    def scanned(self, now: float):
+        """Call after each scan; marks the owed post-settlement scan as taken."""
+        if self.pending is not None and now >= self.pending + self.settle_delay:
+            self.last_settlement = self.pending
+            self.settlement_scans += 1
+            logger.info(f"Post-settlement scan for {self.pending:.0f} taken {now - self.pending:.1f}s after settlement")
+            self.pending = None
+
+    def metrics(self, now: float) -> dict:
+        upcoming = self.settlements[0] if self.settlements else None
+        return {
+            "poll_mode": self.mode,
+            "poll_interval": self.interval,
+            "next_settlement_in": upcoming - now if upcoming else None,
+            "burst_window": self.window,
+            "settlement_scans": self.settlement_scans,
+            "last_settlement": self.last_settlement,
+        }
@@ -0,0 +1,84 @@
+import io
+import os
+import time
+import zlib
+import pickle
+import asyncio
+import logging
+from typing import Optional
+
+logger = logging.getLogger("Snapshot")
+logger.setLevel(logging.INFO)
+
+# File layout: MAGIC | zlib(pickle of plain dicts/lists/tuples/floats)
+MAGIC = b"ATHSNAP1"
+
+
+class _PlainUnpickler(pickle.Unpickler):
+    # Snapshot state is builtins only; refuse anything that would import code
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"Snapshot references {module}.{name}")
+
+
+def write_snapshot(path: str, state: dict):
+    payload = zlib.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL), 1)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + payload)
+    os.replace(tmp, path)  # readers never see a half-written snapshot
+
+def read_snapshot(path: str) -> Optional[dict]:
+    try:
+        with open(path, "rb") as f:
+            blob = f.read()
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logger.warning(f"Snapshot unreadable ({e}), starting cold")
+        return None
+    if not blob.startswith(MAGIC):
+        logger.warning("Snapshot has an unknown format, starting cold")
+        return None
+    try:
+        return _PlainUnpickler(io.BytesIO(zlib.decompress(blob[len(MAGIC):]))).load()
+    except Exception as e:
+        logger.warning(f"Snapshot corrupt ({e}), starting cold")
+        return None
+
+
+class SnapshotStore:
+    """Checkpoints engine state every SNAPSHOT_INTERVAL seconds to SNAPSHOT_PATH (empty disables).
+
+    State is captured on the event loop as plain data; compression and the file write run in a
+    worker thread so a checkpoint never stalls a cycle.
+    """
+
+    def __init__(self, path: Optional[str] = None, interval: Optional[float] = None):
+        self.path = path if path is not None else os.getenv("SNAPSHOT_PATH", "/tmp/athena.snapshot")
+        self.interval = interval if interval is not None else float(os.getenv("SNAPSHOT_INTERVAL", 30))
+        self.last_saved = time.monotonic()
+        self._task = None
+
+    def load(self) -> Optional[dict]:
+        return read_snapshot(self.path) if self.path else None
+
+    def due(self) -> bool:
+        return bool(self.path) and self._task is None and time.monotonic() - self.last_saved >= self.interval
+
+    def save_soon(self, state: dict):
+        self.last_saved = time.monotonic()
+        self._task = asyncio.create_task(self._save(state))
+
+    async def _save(self, state: dict):
+        try:
+            await asyncio.to_thread(write_snapshot, self.path, state)
+        except OSError as e:
+            logger.error(f"Snapshot write failed: {e}")
+        finally:
+            self._task = None
+
+    async def flush(self, state: dict):
+        # Final checkpoint on shutdown
+        if not self.path: return
+        if self._task: await self._task
+        await self._save(state)
@@ -0,0 +1,194 @@
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from models import FundingRate, Opportunity
+from spread_stats import FUNDING_PERIOD
+from instruments import Grouping, index
+
+# Legs settling within this many seconds of each other count as the same settlement
+SETTLEMENT_TOLERANCE = 60.0
+
+
+def next_settlement(rate: FundingRate, now: float) -> float:
+    """Venue-reported next funding time, else the next 00/08/16 UTC boundary."""
+    t = rate.next_funding_time
+    if t and t > now: return t
+    return (now // FUNDING_PERIOD + 1) * FUNDING_PERIOD
+
+
+class SpreadBook:
+    """Running per-symbol min/max funding state that rates can be folded into as they arrive.
+
+    Folding a rate is O(1); only symbols touched since the last ranking get their
+    Opportunity rebuilt, so ranking after every exchange arrival stays cheap. Rates are
+    grouped by `grouping` (instrument id -> group id), so e.g. BTCUSDT and BTC/USDC perps
+    land in the same book under the default quote equivalence. With `age` (rate, now) -> seconds,
+    each Opportunity carries its older leg's age; above `max_age` it is flagged stale, or
+    dropped when `drop_stale` is set.
+
+    Given the `previous` cycle's book, it also tracks which symbols actually changed: a leg that
+    moved by more than `tolerance` from the rate it last changed at, appeared, or disappeared.
+    That is checked inside the fold (O(1) per rate) plus one set difference per venue, so
+    consumers such as the alert engine only look at `changes()`, not at every symbol.
+    """
+
+    def __init__(self, min_spread: float, grouping: Optional[Grouping] = None,
+                 age: Optional[Callable[[FundingRate, float], float]] = None, max_age: float = 0.0, drop_stale: bool = False,
+                 previous: Optional["SpreadBook"] = None, tolerance: float = 0.0):
+        self.min_spread = min_spread
+        self.grouping = grouping or Grouping()
+        self.age, self.max_age, self.drop_stale = age, max_age, drop_stale
+        self.entries: Dict[int, Dict[tuple, FundingRate]] = {}
+        self.low: Dict[int, FundingRate] = {}
+        self.high: Dict[int, FundingRate] = {}
+        self.opportunities: Dict[int, Optional[Opportunity]] = {}
+        self.dirty = set()
+        # Change tracking across cycles: reference rate per leg (carried over), legs per venue
+        self.previous, self.tolerance = previous, tolerance
+        self.reference: Dict[tuple, float] = previous.reference if previous is not None else {}
+        self.by_venue: Dict[str, Set[Tuple[int, tuple]]] = {}
+        self.changed: Set[int] = set()
+
+    def add(self, rates: List[FundingRate]):
+        entries, low, high, dirty = self.entries, self.low, self.high, self.dirty
+        group, intern = self.grouping.group, index.intern
+        reference, by_venue, changed, tolerance = self.reference, self.by_venue, self.changed, self.tolerance
+        for r in rates:
+            # Adapters intern at parse time; rates from elsewhere (snapshots, plugins) by symbol
+            iid = r.instrument
+            if iid is None: iid = intern(r.symbol)
+            sym = group(iid)
+
+            leg = (r.exchange, iid)
+            ref = reference.get(leg)
+            if ref is None or abs(r.rate - ref) > tolerance:
+                reference[leg] = r.rate
+                changed.add(sym)
+            legs = by_venue.get(r.exchange)
+            if legs is None:
+                legs = by_venue[r.exchange] = set()
+            legs.add((sym, leg))
+            book = entries.get(sym)
+            if book is None:
+                entries[sym] = {leg: r}
+                low[sym] = high[sym] = r
+                dirty.add(sym)
+                continue
+
+            replaced = leg in book
+            book[leg] = r
+            if replaced:
+                # Same exchange quoted twice: rescan this symbol (rare)
+                self._rescan(sym, book)
+            else:
+                # Ties: first-seen keeps the long leg, last-seen takes the short leg
+                if r.rate < low[sym].rate: low[sym] = r
+                if r.rate >= high[sym].rate: high[sym] = r
+            dirty.add(sym)
+
+    def _rescan(self, sym: int, book: Dict[tuple, FundingRate]):
+        lo = hi = None
+        for e in book.values():
+            if lo is None or e.rate < lo.rate: lo = e
+            if hi is None or e.rate >= hi.rate: hi = e
+        self.low[sym], self.high[sym] = lo, hi
+
+    def changes(self) -> Dict[str, Optional[Opportunity]]:
+        """Symbols that changed since the previous book -> current Opportunity (None: below
+        min_spread, dropped as stale, or no longer quoted). Call once, after the last add()."""
+        previous, self.previous = self.previous, None  # don't chain every past cycle in memory
+        changed = self.changed
+        if previous is not None:
+            empty = frozenset()
+            for venue, legs in previous.by_venue.items():
+                for sym, leg in legs - self.by_venue.get(venue, empty):
+                    self.reference.pop(leg, None)
+                    changed.add(sym)
+        else:
+            changed.update(self.entries)
+        if self.dirty: self.ranked()
+        names, opps = self.grouping.names, self.opportunities
+        return {names[sym]: opps.get(sym) for sym in changed}
+
+    @property
+    def pair_count(self) -> int:
+        return len(self.entries)
+
+    def spreads(self) -> Dict[str, float]:
+        """Best spread of every symbol quoted on 2+ legs, including those below min_spread."""
+        names, low, high = self.grouping.names, self.low, self.high
+        return {names[sym]: high[sym].rate - low[sym].rate for sym, book in self.entries.items() if len(book) >= 2}
+
+    def routes(self, k: int = 1, include: Iterable[Tuple[str, str, str]] = ()) -> Dict[Tuple[str, str, str], float]:
+        """(symbol, long venue, short venue) -> spread for each symbol's `k` widest routes, below min_spread
+        too, plus every route in `include` that is still quoted (so a tracked route is never left unobserved)."""
+        names, out = self.grouping.names, {}
+        for sym, book in self.entries.items():
+            if len(book) < 2: continue
+            name = names[sym]
+            legs = sorted(book.values(), key=lambda r: r.rate)
+            pairs = sorted(((hi.rate - lo.rate, lo.exchange, hi.exchange) for lo in legs[:k] for hi in legs[-k:] if hi is not lo),
+                           reverse=True)
+            for spread, long_ex, short_ex in pairs[:k]:
+                out.setdefault((name, long_ex, short_ex), spread)
+        missing = [key for key in include if key not in out]
+        if missing:
+            gid_of = {name: gid for gid, name in enumerate(names)}
+            for key in missing:
+                name, long_ex, short_ex = key
+                book = self.entries.get(gid_of.get(name))
+                if not book: continue
+                longs = [r.rate for (ex, _), r in book.items() if ex == long_ex]
+                shorts = [r.rate for (ex, _), r in book.items() if ex == short_ex]
+                if longs and shorts and (long_ex != short_ex or len(longs) >= 2):
+                    out[key] = max(shorts) - min(longs)
+        return out
+
+    def ranked(self) -> List[Opportunity]:
+        now = time.time()
+        for sym in self.dirty:
+            self.opportunities[sym] = self._build(sym, now)
+        self.dirty.clear()
+        opps = [o for o in self.opportunities.values() if o is not None]
+        return sorted(opps, key=lambda x: x.spread, reverse=True)
+
+    def _build(self, sym: int, now: float) -> Optional[Opportunity]:
+        if len(self.entries[sym]) < 2: return None
+        long, short = self.low[sym], self.high[sym]
+
+        # Spread Calculation
+        spread = short.rate - long.rate
+        if spread < self.min_spread: return None
+
+        max_leg_age, stale = None, False
+        if self.age is not None:
+            max_leg_age = max(self.age(long, now), self.age(short, now))
+            stale = 0 < self.max_age < max_leg_age
+            if stale and self.drop_stale: return None
+
+        # Basis between the legs' mark prices (entry cost/gain on convergence)
+        basis = None
+        if long.mark_price and short.mark_price:
+            basis = (short.mark_price - long.mark_price) / long.mark_price * 100
+
+        # Only legs that settle at the first upcoming settlement pay out before it
+        long_at, short_at = next_settlement(long, now), next_settlement(short, now)
+        first = min(long_at, short_at)
+        receivable = ((-long.rate if long_at - first <= SETTLEMENT_TOLERANCE else 0.0)
+                      + (short.rate if short_at - first <= SETTLEMENT_TOLERANCE else 0.0))
+
+        return Opportunity(
+            symbol=self.grouping.names[sym],
+            long_exchange=long.exchange,
+            long_rate=long.rate,
+            short_exchange=short.exchange,
+            short_rate=short.rate,
+            spread=spread,
+            annualized_spread=spread * 3 * 365,
+            basis=basis,
+            time_to_settlement=first - now,
+            receivable=receivable,
+            long_symbol=long.symbol,
+            short_symbol=short.symbol,
+            max_leg_age=max_leg_age,
+            stale=stale,
+        )
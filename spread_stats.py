@@ -0,0 +1,154 @@
+import os
+import math
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from models import Opportunity
+
+FUNDING_PERIOD = 8 * 3600
+
+# Keys usable with RANK_BY
+RANK_KEYS = {
+    "spread": lambda o: o.spread,
+    "ewma": lambda o: o.spread_ewma if o.spread_ewma is not None else o.spread,
+    "mean": lambda o: o.spread_mean if o.spread_mean is not None else o.spread,
+    "time_above": lambda o: (o.time_above or 0.0, o.spread),
+    "persistence": lambda o: (o.periods_persisted or 0, o.time_above or 0.0, o.spread),
+}
+
+
+class PairStats:
+    """Online statistics for one (symbol, long venue, short venue) route. Every update is O(1)."""
+    __slots__ = ("ewma", "count", "mean", "m2", "last_ts", "above_since", "streak_period")
+
+    def __init__(self):
+        self.ewma = 0.0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.last_ts = None
+        self.above_since = None    # start of the current continuous stretch above threshold
+        self.streak_period = None  # funding period index in which that stretch started
+
+    def update(self, spread: float, ts: float, above: bool, half_life: float):
+        # Time-decayed EWMA: irregular cycle spacing weighs by elapsed time, not by sample count
+        if self.count == 0:
+            self.ewma = spread
+        else:
+            alpha = 1.0 - math.exp(-math.log(2) * max(ts - self.last_ts, 0.0) / half_life)
+            self.ewma += alpha * (spread - self.ewma)
+
+        # Welford mean / variance
+        self.count += 1
+        delta = spread - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (spread - self.mean)
+        self.last_ts = ts
+
+        if above:
+            if self.above_since is None:
+                self.above_since = ts
+                self.streak_period = int(ts // FUNDING_PERIOD)
+        else:
+            self.break_streak()
+
+    def break_streak(self):
+        self.above_since = None
+        self.streak_period = None
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def time_above(self, ts: float) -> float:
+        return ts - self.above_since if self.above_since is not None else 0.0
+
+    def periods(self, ts: float) -> int:
+        # Funding settlements crossed since the stretch began
+        return int(ts // FUNDING_PERIOD) - self.streak_period if self.streak_period is not None else 0
+
+
+class SpreadStatsTracker:
+    """Bounded LRU of PairStats; routes idle for STATS_TTL seconds or beyond STATS_MAX_PAIRS are evicted."""
+
+    def __init__(self, threshold: Optional[float] = None, half_life: Optional[float] = None, max_pairs: Optional[int] = None,
+                 ttl: Optional[float] = None, routes_per_symbol: Optional[int] = None):
+        # Arguments left as None fall back to the STATS_* env variables
+        self.threshold = threshold if threshold is not None else float(os.getenv("STATS_THRESHOLD", os.getenv("MIN_SPREAD", 0.025)))
+        self.half_life = half_life if half_life is not None else float(os.getenv("STATS_HALF_LIFE", 3600))
+        self.max_pairs = max_pairs if max_pairs is not None else int(os.getenv("STATS_MAX_PAIRS", 5000))
+        self.ttl = ttl if ttl is not None else float(os.getenv("STATS_TTL", 3 * FUNDING_PERIOD))
+        # Widest routes per symbol fed each cycle
+        self.routes_per_symbol = routes_per_symbol if routes_per_symbol is not None else int(os.getenv("STATS_ROUTES", 4))
+        self.pairs: "OrderedDict[Tuple[str, str, str], PairStats]" = OrderedDict()
+        self.streaking = set()  # routes currently above threshold
+
+    def annotate(self, opportunities: List[Opportunity], ts: float,
+                 routes: Optional[Dict[Tuple[str, str, str], float]] = None) -> List[Opportunity]:
+        """Update route statistics and copy them onto the opportunities.
+
+        `routes` (SpreadBook.routes()) holds each symbol's widest routes this cycle plus every route
+        currently streaking, including spreads below MIN_SPREAD, so mean/std/EWMA see the quiet
+        stretches and a streak ends only when that route's own spread drops below the threshold.
+        """
+        if routes is None:
+            routes = {(o.symbol, o.long_exchange, o.short_exchange): o.spread for o in opportunities}
+        pairs, seen, out = self.pairs, set(), []
+        for key, spread in routes.items():
+            stats = pairs.get(key)
+            if stats is None:
+                stats = pairs[key] = PairStats()
+            else:
+                pairs.move_to_end(key)
+            stats.update(spread, ts, spread >= self.threshold, self.half_life)
+            seen.add(key)
+        for o in opportunities:
+            key = (o.symbol, o.long_exchange, o.short_exchange)
+            stats = pairs.get(key)
+            if key not in seen:
+                if stats is None: stats = pairs[key] = PairStats()
+                stats.update(o.spread, ts, o.spread >= self.threshold, self.half_life)
+                seen.add(key)
+            out.append(o.model_copy(update={
+                "spread_ewma": stats.ewma,
+                "spread_mean": stats.mean,
+                "spread_std": stats.std,
+                "observations": stats.count,
+                "time_above": stats.time_above(ts),
+                "periods_persisted": stats.periods(ts),
+            }))
+
+        # A streaking route missing from `routes` is no longer quoted (a leg disappeared): its streak ends
+        for key in self.streaking - seen:
+            stats = pairs.get(key)
+            if stats: stats.break_streak()
+        self.streaking = {k for k in seen if pairs[k].above_since is not None}
+
+        self._evict(ts)
+        return out
+
+    def _evict(self, ts: float):
+        pairs = self.pairs
+        while pairs:
+            key, stats = next(iter(pairs.items()))
+            if len(pairs) <= self.max_pairs and ts - stats.last_ts < self.ttl: break
+            del pairs[key]
+            self.streaking.discard(key)
+
+    # Plain-data state for warm restarts (see snapshot.py); LRU order is preserved
+    def export_state(self) -> dict:
+        return {
+            "pairs": [(key, tuple(getattr(stats, f) for f in PairStats.__slots__)) for key, stats in self.pairs.items()],
+            "streaking": list(self.streaking),
+        }
+
+    def load_state(self, data: dict):
+        self.pairs = OrderedDict()
+        for key, values in data.get("pairs", ()):
+            stats = self.pairs[tuple(key)] = PairStats()
+            for field, value in zip(PairStats.__slots__, values):
+                setattr(stats, field, value)
+        self.streaking = {tuple(k) for k in data.get("streaking", ()) if tuple(k) in self.pairs}
+
+
+def rank(opportunities: List[Opportunity], key: str = "spread") -> List[Opportunity]:
+    return sorted(opportunities, key=RANK_KEYS.get(key, RANK_KEYS["spread"]), reverse=True)
@@ -0,0 +1,272 @@
+// ATHENA dashboard: keyed, virtualized opportunity list + canvas chart. No external libraries.
+(() => {
+    'use strict';
+
+    const ROW_H = 48;        // keep in sync with --row-h in dashboard.css
+    const OVERSCAN = 8;      // rows rendered above/below the visible window
+    const POLL_MS = 2000;
+
+    const $ = (id) => document.getElementById(id);
+    const dom = {
+        viewport: $('opp-viewport'),
+        spacer: $('opp-spacer'),
+        empty: $('opp-empty'),
+        search: $('table-search'),
+        chart: $('spread-chart'),
+        logs: $('activity-log'),
+        timer: $('funding-timer'),
+        clock: $('utc-clock'),
+        status: $('status-text'),
+        dot: $('status-dot'),
+        stats: {
+            maxSpread: $('stat-max-spread'),
+            count: $('stat-opp-count'),
+            longDom: $('stat-dom-long'),
+            shortDom: $('stat-dom-short'),
+            exchanges: $('stat-exchanges'),
+            pairs: $('stat-pairs'),
+        },
+    };
+
+    let opportunities = [];   // latest payload, ranked
+    let view = [];            // after the search filter
+    let lastUpdate = -1;
+    let lastTop = '';
+    let chartKey = '';
+    let paintQueued = false;
+    const mounted = new Map(); // symbol -> row element currently in the DOM
+    const pool = [];           // detached row elements for reuse
+
+    const pct = (n) => n.toFixed(4) + '%';
+    const setText = (el, value) => { value = String(value); if (el.textContent !== value) el.textContent = value; };
+
+    // ROWS
+    function makeRow() {
+        const el = document.createElement('div');
+        el.className = 'row cols';
+        el.innerHTML =
+            '<div class="rank"></div><div class="sym" title="Copy pair"></div>' +
+            '<div class="right"><span class="spread"></span></div>' +
+            '<div class="route"><span class="leg long"></span><span>&rarr;</span><span class="leg short"></span></div>' +
+            '<div class="rate"></div><div class="rate"></div>';
+        const c = el.children;
+        el._cells = {
+            rank: c[0], sym: c[1], spread: c[2].firstChild,
+            long: c[3].children[0], short: c[3].children[2], lrate: c[4], srate: c[5],
+        };
+        el._v = {};  // last written values; only changed cells touch the DOM
+        return el;
+    }
+
+    function put(el, field, value) {
+        if (el._v[field] !== value) {
+            el._v[field] = value;
+            el._cells[field].textContent = value;
+        }
+    }
+
+    function putClass(el, field, cls) {
+        const key = field + '.cls';
+        if (el._v[key] !== cls) {
+            el._v[key] = cls;
+            el._cells[field].className = cls;
+        }
+    }
+
+    // Venue plus instrument when the leg trades a different quote/margin than the group (same-venue legs)
+    function leg(exchange, instrument, symbol) {
+        return instrument && instrument !== symbol ? `${exchange} ${instrument}` : exchange;
+    }
+
+    function fill(el, o, i) {
+        if (el._v.i !== i) {
+            el._v.i = i;
+            el.style.transform = `translateY(${i * ROW_H}px)`;
+        }
+        if (el._v.stale !== !!o.stale) {
+            el._v.stale = !!o.stale;
+            el.classList.toggle('stale', el._v.stale);
+            el.title = el._v.stale ? `Stale: oldest leg ${Math.round(o.max_leg_age)}s old` : '';
+        }
+        put(el, 'rank', i + 1);
+        putClass(el, 'rank', i < 3 ? `rank r${i + 1}` : 'rank');
+        put(el, 'sym', o.symbol);
+        put(el, 'spread', pct(o.spread));
+        put(el, 'long', leg(o.long_exchange, o.long_symbol, o.symbol));
+        put(el, 'short', leg(o.short_exchange, o.short_symbol, o.symbol));
+        // Long receives when funding is negative, short receives when positive
+        put(el, 'lrate', pct(o.long_rate));
+        putClass(el, 'lrate', o.long_rate < 0 ? 'rate recv' : 'rate pay');
+        put(el, 'srate', pct(o.short_rate));
+        putClass(el, 'srate', o.short_rate > 0 ? 'rate recv' : 'rate pay');
+    }
+
+    function paint() {
+        paintQueued = false;
+        const top = dom.viewport.scrollTop;
+        const first = Math.max(0, Math.floor(top / ROW_H) - OVERSCAN);
+        const last = Math.min(view.length, Math.ceil((top + dom.viewport.clientHeight) / ROW_H) + OVERSCAN);
+
+        const visible = new Set();
+        for (let i = first; i < last; i++) {
+            const o = view[i];
+            visible.add(o.symbol);
+            let el = mounted.get(o.symbol);
+            if (!el) {
+                el = pool.pop() || makeRow();
+                mounted.set(o.symbol, el);
+                dom.spacer.appendChild(el);
+            }
+            fill(el, o, i);
+        }
+        for (const [symbol, el] of mounted) {
+            if (!visible.has(symbol)) {
+                mounted.delete(symbol);
+                el.remove();
+                pool.push(el);
+            }
+        }
+        dom.spacer.style.height = `${view.length * ROW_H}px`;
+        dom.empty.hidden = view.length > 0;
+    }
+
+    function schedulePaint() {
+        if (!paintQueued) {
+            paintQueued = true;
+            requestAnimationFrame(paint);
+        }
+    }
+
+    function applyFilter() {
+        const filter = dom.search.value.trim().toUpperCase();
+        view = filter ? opportunities.filter((o) => o.symbol.includes(filter)) : opportunities;
+        schedulePaint();
+        drawChart();
+    }
+
+    // CHART (top 5 spreads as bars)
+    function drawChart() {
+        const top5 = view.slice(0, 5);
+        const canvas = dom.chart;
+        const dpr = window.devicePixelRatio || 1;
+        const w = canvas.clientWidth, h = canvas.clientHeight;
+        const key = `${w}x${h}@${dpr}|` + top5.map((o) => o.symbol + ':' + o.spread).join(',');
+        if (key === chartKey || !w || !h) return;
+        chartKey = key;
+
+        canvas.width = Math.round(w * dpr);
+        canvas.height = Math.round(h * dpr);
+        const ctx = canvas.getContext('2d');
+        ctx.setTransform(dpr, 0, 0, dpr, 0, 0);
+        ctx.clearRect(0, 0, w, h);
+        if (!top5.length) return;
+
+        const font = getComputedStyle(document.body).getPropertyValue('--mono');
+        const padL = 44, padB = 22, padT = 8;
+        const max = Math.max(...top5.map((o) => o.spread)) * 1.1 || 1;
+        const plotH = h - padB - padT, plotW = w - padL;
+
+        ctx.font = `10px ${font}`;
+        ctx.fillStyle = '#94a3b8';
+        ctx.strokeStyle = 'rgba(255, 255, 255, 0.05)';
+        ctx.textBaseline = 'middle';
+        ctx.textAlign = 'right';
+        for (let t = 0; t <= 4; t++) {
+            const y = padT + plotH - (plotH * t) / 4;
+            ctx.beginPath();
+            ctx.moveTo(padL, y);
+            ctx.lineTo(w, y);
+            ctx.stroke();
+            ctx.fillText(((max * t) / 4).toFixed(2), padL - 6, y);
+        }
+
+        const slot = plotW / top5.length, barW = Math.min(20, slot * 0.6);
+        ctx.textAlign = 'center';
+        ctx.textBaseline = 'top';
+        top5.forEach((o, i) => {
+            const x = padL + slot * i + (slot - barW) / 2;
+            const bh = (o.spread / max) * plotH;
+            ctx.fillStyle = '#6366f1';
+            ctx.beginPath();
+            if (ctx.roundRect) ctx.roundRect(x, padT + plotH - bh, barW, bh, [4, 4, 0, 0]);
+            else ctx.rect(x, padT + plotH - bh, barW, bh);
+            ctx.fill();
+            ctx.fillStyle = '#94a3b8';
+            ctx.fillText(o.symbol.replace(/USDT$/, ''), padL + slot * i + slot / 2, h - padB + 6);
+        });
+    }
+
+    // ACTIVITY LOG
+    function addLog(symbol, spread) {
+        const item = document.createElement('div');
+        item.className = 'log-item';
+        const left = document.createElement('span');
+        const b = document.createElement('b');
+        b.textContent = symbol;
+        left.append('Found ', b);
+        const right = document.createElement('span');
+        right.className = 'gain';
+        right.textContent = '+' + pct(spread);
+        item.append(left, right);
+        dom.logs.prepend(item);
+        if (dom.logs.children.length > 20) dom.logs.lastChild.remove();
+    }
+
+    // CLOCK + FUNDING COUNTDOWN (00/08/16 UTC)
+    function updateClock() {
+        const now = new Date();
+        setText(dom.clock, now.toISOString().split('T')[1].split('.')[0] + ' UTC');
+        const h = now.getUTCHours();
+        const target = new Date(now);
+        target.setUTCHours(h < 8 ? 8 : h < 16 ? 16 : 24, 0, 0, 0);
+        const diff = target - now;
+        const two = (n) => Math.floor(n).toString().padStart(2, '0');
+        setText(dom.timer, `${two(diff / 3600000)}:${two((diff % 3600000) / 60000)}:${two((diff % 60000) / 1000)}`);
+    }
+
+    // POLLING
+    async function poll() {
+        try {
+            const res = await fetch('/api/data', { cache: 'no-store' });
+            const data = await res.json();
+            const meta = data.metadata;
+            if (!meta || meta.last_update === lastUpdate) return;
+            lastUpdate = meta.last_update;
+            opportunities = data.opportunities || [];
+
+            const s = dom.stats;
+            setText(s.maxSpread, opportunities.length ? pct(opportunities[0].spread) : '0.00%');
+            setText(s.count, meta.count);
+            setText(s.longDom, meta.top_long_exchange);
+            setText(s.shortDom, meta.top_short_exchange);
+            setText(s.exchanges, meta.active_exchanges);
+            setText(s.pairs, meta.total_pairs_scanned);
+            setText(dom.status, meta.restored ? 'Restored Snapshot' : 'System Online');
+            dom.dot.classList.toggle('stale', !!meta.restored);
+
+            applyFilter();
+
+            if (opportunities.length && opportunities[0].symbol !== lastTop) {
+                lastTop = opportunities[0].symbol;
+                addLog(lastTop, opportunities[0].spread);
+            }
+        } catch (e) {
+            console.error(e);
+        }
+    }
+
+    // EVENTS
+    dom.viewport.addEventListener('scroll', schedulePaint, { passive: true });
+    dom.search.addEventListener('input', applyFilter);
+    dom.viewport.addEventListener('click', (e) => {
+        const sym = e.target.closest('.sym');
+        if (sym && navigator.clipboard) navigator.clipboard.writeText(sym.textContent);
+    });
+    new ResizeObserver(() => { schedulePaint(); drawChart(); }).observe(dom.viewport);
+    new ResizeObserver(drawChart).observe(dom.chart);
+
+    updateClock();
+    setInterval(updateClock, 1000);
+    setInterval(poll, POLL_MS);
+    poll();
+})();
@@ -0,0 +1,166 @@
+"""Per-chat Telegram watchlists: which symbols and venues each chat wants alerts for.
+
+    python subscriptions.py add 123456 --symbols BTCUSDT,ETHUSDT --venues Binance,Bybit,OKX --min-spread 0.05
+    python subscriptions.py remove 123456
+    python subscriptions.py list
+
+Stored as JSON at SUBSCRIPTIONS_PATH; the running bot picks up edits on its next alert cycle.
+An empty symbol or venue list matches everything. A chat's --min-spread above ALERT_SPREAD gets
+its own crossing/widening alerts at that level (one alert state per distinct min spread).
+"""
+import os
+import sys
+import json
+import logging
+import argparse
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger("Subscriptions")
+logger.setLevel(logging.INFO)
+
+ANY = "*"
+
+
+@dataclass
+class Subscription:
+    chat_id: str
+    symbols: Set[str] = field(default_factory=set)   # empty: every symbol
+    venues: Set[str] = field(default_factory=set)    # empty: every venue; both legs must be listed
+    min_spread: float = 0.0
+
+    def to_json(self) -> dict:
+        return {"symbols": sorted(self.symbols), "venues": sorted(self.venues), "min_spread": self.min_spread}
+
+    @classmethod
+    def from_json(cls, chat_id: str, data: dict) -> "Subscription":
+        return cls(str(chat_id), {s.upper() for s in data.get("symbols", ())},
+                   {v.lower() for v in data.get("venues", ())}, float(data.get("min_spread", 0.0)))
+
+
+class SubscriptionStore:
+    """Subscriptions plus inverted indexes symbol -> chats and venue -> chats.
+
+    Matching an opportunity is two dict lookups and a set intersection, so routing cost follows
+    the number of alerts and interested chats, not the number of subscribers.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path if path is not None else os.getenv(
+            "SUBSCRIPTIONS_PATH", os.path.join(os.path.expanduser("~"), ".athena", "subscriptions.json"))
+        self.subs: Dict[str, Subscription] = {}
+        self.by_symbol: Dict[str, Set[str]] = {}
+        self.by_venue: Dict[str, Set[str]] = {}
+        self.tiers: Dict[float, Set[str]] = {}  # min_spread -> chats; each tier keeps its own alert state
+        self._mtime = None
+
+    def __len__(self) -> int:
+        return len(self.subs)
+
+    def __contains__(self, chat_id: str) -> bool:
+        return chat_id in self.subs
+
+    # PERSISTENCE
+    def refresh(self):
+        """Reload when the file changed on disk (one stat() per call)."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self._mtime: return
+        self._mtime = mtime
+        self.subs = {}
+        if mtime is not None:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    data = json.load(f)
+                self.subs = {str(chat): Subscription.from_json(chat, entry) for chat, entry in data.items()}
+            except (OSError, ValueError, TypeError, AttributeError) as e:
+                logger.error(f"Subscriptions unreadable ({e}), ignoring {self.path}")
+        self._reindex()
+
+    def save(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({chat: sub.to_json() for chat, sub in sorted(self.subs.items())}, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def put(self, sub: Subscription):
+        self.subs[sub.chat_id] = sub
+        self._reindex()
+
+    def remove(self, chat_id: str) -> bool:
+        found = self.subs.pop(chat_id, None) is not None
+        self._reindex()
+        return found
+
+    def _reindex(self):
+        by_symbol, by_venue, tiers = {}, {}, {}
+        for chat, sub in self.subs.items():
+            tiers.setdefault(sub.min_spread, set()).add(chat)
+            for sym in sub.symbols or (ANY,):
+                by_symbol.setdefault(sym, set()).add(chat)
+            for venue in sub.venues or (ANY,):
+                by_venue.setdefault(venue, set()).add(chat)
+        self.by_symbol, self.by_venue, self.tiers = by_symbol, by_venue, tiers
+
+    # MATCHING
+    def chats_for(self, symbol: str, long_exchange: str, short_exchange: str, spread: float) -> Set[str]:
+        empty = ()
+        by_symbol, by_venue = self.by_symbol, self.by_venue
+        chats = by_symbol.get(symbol, set()).union(by_symbol.get(ANY, empty))
+        if not chats: return chats
+        anywhere = by_venue.get(ANY, empty)
+        chats &= by_venue.get(long_exchange.lower(), set()).union(anywhere)
+        chats &= by_venue.get(short_exchange.lower(), set()).union(anywhere)
+        subs = self.subs
+        return {chat for chat in chats if spread >= subs[chat].min_spread}
+
+    def route(self, events: Iterable) -> Dict[str, List]:
+        """Alert events -> {chat_id: that chat's events}, preserving event order."""
+        routed: Dict[str, List] = {}
+        for event in events:
+            o = event.opportunity
+            for chat in self.chats_for(o.symbol, o.long_exchange, o.short_exchange, o.spread):
+                routed.setdefault(chat, []).append(event)
+        return routed
+
+
+def _split(value: Optional[str]) -> Set[str]:
+    return {v.strip() for v in value.split(",") if v.strip()} if value else set()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Manage per-chat alert subscriptions")
+    parser.add_argument("--path", help="subscriptions file (default: SUBSCRIPTIONS_PATH)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    add = sub.add_parser("add", help="create or replace a chat's subscription")
+    add.add_argument("chat_id")
+    add.add_argument("--symbols", help="comma-separated symbols, e.g. BTCUSDT,ETHUSDT (default: all)")
+    add.add_argument("--venues", help="comma-separated venues both legs must be on (default: all)")
+    add.add_argument("--min-spread", type=float, default=0.0, help="minimum spread in %% for this chat")
+    rm = sub.add_parser("remove", help="delete a chat's subscription (it falls back to the full digest)")
+    rm.add_argument("chat_id")
+    sub.add_parser("list")
+    args = parser.parse_args(argv)
+
+    store = SubscriptionStore(args.path)
+    store.refresh()
+    if args.command == "add":
+        store.put(Subscription.from_json(args.chat_id, {
+            "symbols": _split(args.symbols), "venues": _split(args.venues), "min_spread": args.min_spread}))
+        store.save()
+    elif args.command == "remove":
+        if not store.remove(args.chat_id):
+            print(f"No subscription for {args.chat_id}", file=sys.stderr)
+            return 1
+        store.save()
+    else:
+        for chat, s in sorted(store.subs.items()):
+            print(f"{chat:<16} symbols={','.join(sorted(s.symbols)) or ANY} "
+                  f"venues={','.join(sorted(s.venues)) or ANY} min_spread={s.min_spread}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
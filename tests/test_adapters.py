@@ -0,0 +1,134 @@
+import pytest
+
+from adapters import REGISTRY, parse
+
+TS = 1_700_000_000.0
+
+# One trimmed payload per venue in the shape the endpoint returns, with the rows parse() should
+# yield as (symbol, rate %). Each includes a zero rate (kept) and a row the venue's filter skips.
+FIXTURES = {
+    "Binance": ([
+        {"symbol": "BTCUSDT", "markPrice": "37000.1", "indexPrice": "36990.5", "lastFundingRate": "0.00010000",
+         "nextFundingTime": 1700006400000, "time": 1699999999000},
+        {"symbol": "ETHUSDC", "lastFundingRate": "0.00000000", "nextFundingTime": 1700006400000, "time": 1699999999000},
+        {"symbol": "BTCUSDT_240329", "lastFundingRate": "", "time": 1699999999000},
+    ], [("BTCUSDT", 0.01), ("ETHUSDC", 0.0)]),
+    "Bybit": ({"retCode": 0, "time": 1699999999000, "result": {"category": "linear", "list": [
+        {"symbol": "BTCUSDT", "fundingRate": "0.0001", "markPrice": "37000", "nextFundingTime": "1700006400000"},
+        {"symbol": "BTCPERP", "fundingRate": "0", "markPrice": "37001"},
+        {"symbol": "BTC-29MAR24", "fundingRate": "", "markPrice": "37500"},
+    ]}}, [("BTCUSDT", 0.01), ("BTCUSDC", 0.0)]),
+    "OKX": ({"code": "0", "data": [
+        {"instId": "BTC-USDT-SWAP", "fundingRate": "0.0001", "fundingTime": "1700006400000", "ts": "1699999999000"},
+        {"instId": "BTC-USD-SWAP", "fundingRate": "0", "ts": "1699999999000"},
+        {"instId": "BTC-USDT-240329", "fundingRate": "0.0001", "ts": "1699999999000"},
+    ]}, [("BTCUSDT", 0.01), ("BTCUSD-INV", 0.0)]),
+    "GateIO": ([
+        {"contract": "BTC_USDT", "funding_rate": "0.0001", "mark_price": "37000"},
+        {"contract": "ETH_USDT", "funding_rate": "0"},
+        {"contract": "BTC_USD", "funding_rate": "0.0001"},
+    ], [("BTCUSDT", 0.01), ("ETHUSDT", 0.0)]),
+    "KuCoin": ({"code": "200000", "data": [
+        {"symbol": "XBTUSDTM", "fundingFeeRate": 0.0001, "markPrice": 37000, "nextFundingRateDateTime": 1700006400000},
+        {"symbol": "XBTUSDM", "fundingFeeRate": 0},
+        {"symbol": "XBTMZ24", "fundingFeeRate": None},
+    ]}, [("BTCUSDT", 0.01), ("BTCUSD-INV", 0.0)]),
+    "Bitget": ({"code": "00000", "data": [
+        {"symbol": "BTCUSDT", "fundingRate": "0.0001", "markPrice": "37000", "ts": "1699999999000"},
+        {"symbol": "ETHUSDT", "fundingRate": "0"},
+        {"symbol": "BTCPERP", "fundingRate": "0.0001"},
+    ]}, [("BTCUSDT", 0.01), ("ETHUSDT", 0.0)]),
+    "MEXC": ({"success": True, "code": 0, "data": [
+        {"symbol": "BTC_USDT", "fundingRate": 0.0001, "fairPrice": 37000, "timestamp": 1699999999000},
+        {"symbol": "BTC_USD", "fundingRate": 0},
+        {"symbol": "BTC_EUR", "fundingRate": 0.0001},
+    ]}, [("BTCUSDT", 0.01), ("BTCUSD-INV", 0.0)]),
+    "Huobi": ({"status": "ok", "ts": 1699999999000, "data": [
+        {"contract_code": "BTC-USDT", "funding_rate": "0.0001"},
+        {"contract_code": "ETH-USDT", "funding_rate": "0"},
+        {"contract_code": "BTC-USDT-240329", "funding_rate": None},
+    ]}, [("BTCUSDT", 0.01), ("ETHUSDT", 0.0)]),
+    "BingX": ({"code": 0, "data": [
+        {"symbol": "BTC-USDT", "lastFundingRate": "0.0001", "markPrice": "37000", "nextFundingTime": 1700006400000},
+        {"symbol": "ETH-USDT", "lastFundingRate": "0"},
+        {"symbol": "NCSKGME2USD-USDT", "lastFundingRate": ""},
+    ]}, [("BTCUSDT", 0.01), ("ETHUSDT", 0.0)]),
+    # Both the linear PF_ and the inverse PI_ perp are kept; futures carry no fundingRate
+    "Kraken": ({"result": "success", "serverTime": "2023-11-14T22:13:20.000Z", "tickers": [
+        {"symbol": "PF_XBTUSD", "fundingRate": 0.01},
+        {"symbol": "PI_XBTUSD", "fundingRate": 0.0},
+        {"symbol": "FI_XBTUSD_240329", "markPrice": 37500},
+    ]}, [("BTCUSD", 0.01), ("BTCUSD-INV", 0.0)]),
+    "dYdX": ({"markets": {
+        "BTC-USD": {"ticker": "BTC-USD", "nextFundingRate": "0.0001"},
+        "ETH-USD": {"ticker": "ETH-USD", "nextFundingRate": "0"},
+        "FOO-EUR": {"ticker": "FOO-EUR", "nextFundingRate": "0.0001"},
+    }}, [("BTCUSD", 0.01), ("ETHUSD", 0.0)]),
+    # Inverse XBTUSD and the quanto ETHUSD were dropped by the old per-venue parser
+    "BitMEX": ([
+        {"symbol": "XBTUSD", "typ": "FFWCSX", "underlying": "XBT", "quoteCurrency": "USD", "isInverse": True,
+         "fundingRate": 0.0001, "timestamp": "2023-11-14T22:13:19.000Z"},
+        {"symbol": "ETHUSD", "typ": "FFWCSX", "underlying": "ETH", "quoteCurrency": "USD", "isInverse": False, "fundingRate": 0},
+        {"symbol": "XBTUSDT", "typ": "FFWCSX", "underlying": "XBT", "quoteCurrency": "USDT", "isInverse": False,
+         "fundingRate": 0.0001},
+        {"symbol": "XBTH24", "typ": "FFCCSX", "underlying": "XBT", "quoteCurrency": "USD", "fundingRate": None},
+    ], [("BTCUSD-INV", 0.01), ("ETHUSD", 0.0), ("BTCUSDT", 0.01)]),
+    "Phemex": ({"error": None, "id": 0, "result": [
+        {"symbol": "BTCUSDT", "fundingRate": 10000, "timestamp": 1699999999000000000},
+        {"symbol": "ETHUSDT", "fundingRate": 0},
+        {"symbol": "BTCUSD", "fundingRate": 10000},
+    ]}, [("BTCUSDT", 0.01), ("ETHUSDT", 0.0)]),
+    "HTX": ({"status": "ok", "ts": 1699999999000, "data": [
+        {"contract_code": "BTC-USDT", "funding_rate": "0.0001"},
+        {"contract_code": "ETH-USDT", "funding_rate": "0"},
+        {"contract_code": "BTC-USD", "funding_rate": "0.0001"},
+    ]}, [("BTCUSDT", 0.01), ("ETHUSDT", 0.0)]),
+    # USD-settled perps are kept under their own quote instead of being folded into USDT
+    "CryptoCom": ({"code": 0, "result": {"data": [
+        {"i": "BTCUSD-PERP", "v": "0.0001", "t": 1699999999000},
+        {"i": "ETHUSD-PERP", "v": "0", "t": 1699999999000},
+        {"i": "BTCUSD-240329", "v": "0.0001", "t": 1699999999000},
+    ]}}, [("BTCUSD", 0.01), ("ETHUSD", 0.0)]),
+    "Coinbase": ({"results": [
+        {"symbol": "BTC-PERP", "type": "PERPETUAL", "funding_rate": "0.0001"},
+        {"symbol": "ETH-PERP", "type": "PERPETUAL", "funding_rate": "0"},
+        {"symbol": "BTC-USDC", "type": "SPOT"},
+    ]}, [("BTCUSDC", 0.01), ("ETHUSDC", 0.0)]),
+    "Hyperliquid": ([
+        {"universe": [{"name": "BTC"}, {"name": "ETH"}, {"name": ""}]},
+        [{"funding": "0.0001", "markPx": "37000", "oraclePx": "36990"}, {"funding": "0"}, {"funding": "0.0001"}],
+    ], [("BTCUSDC", 0.01), ("ETHUSDC", 0.0)]),
+    "CoinEx": ({"code": 0, "data": {"date": 1699999999000, "ticker": {
+        "BTCUSDT": {"funding_rate_next": "0.0001", "funding_rate_last": "0.0002"},
+        "ETHUSDT": {"funding_rate_next": "0", "funding_rate_last": "0"},
+        "BTCUSD": {"funding_rate_next": "0.0001"},
+    }}}, [("BTCUSDT", 0.01), ("ETHUSDT", 0.0)]),
+    "BitUnix": ({"code": 0, "data": [
+        {"symbol": "BTCUSDT", "fundingRate": "0.01"},
+        {"symbol": "ETHUSDT", "fundingRate": "0"},
+        {"symbol": "BTCUSDC", "fundingRate": "0.01"},
+    ]}, [("BTCUSDT", 0.01), ("ETHUSDT", 0.0)]),
+}
+
+
+def test_every_venue_has_a_fixture():
+    assert set(FIXTURES) == set(REGISTRY)
+
+
+@pytest.mark.parametrize("venue", sorted(FIXTURES))
+def test_parse_recorded_payload(venue):
+    payload, expected = FIXTURES[venue]
+    rates = parse(REGISTRY[venue], payload, TS)
+    assert [(r.symbol, r.rate) for r in rates] == [(s, pytest.approx(v)) for s, v in expected]
+    assert all(r.exchange == venue and r.timestamp == TS for r in rates)
+
+
+@pytest.mark.parametrize("venue", sorted(FIXTURES))
+def test_parse_rejects_error_payload(venue):
+    assert parse(REGISTRY[venue], {"code": 400, "msg": "error"}, TS) == []
+
+
+def test_parse_reads_extras():
+    rate = parse(REGISTRY["Binance"], FIXTURES["Binance"][0], TS)[0]
+    assert rate.mark_price == 37000.1 and rate.index_price == 36990.5
+    assert rate.next_funding_time == 1700006400.0 and rate.event_time == 1699999999.0
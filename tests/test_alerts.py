@@ -0,0 +1,55 @@
+from alerts import AlertEngine
+from models import FundingRate, Opportunity
+from spread_book import SpreadBook
+
+
+def _opp(spread):
+    return Opportunity(symbol="BTCUSDT", long_exchange="A", long_rate=0.0, short_exchange="B",
+                       short_rate=spread, spread=spread, annualized_spread=spread * 1095)
+
+
+def test_hysteresis_holds_for_symbols_below_min_spread(monkeypatch):
+    monkeypatch.setenv("ALERT_COOLDOWN", "0")
+    engine = AlertEngine()
+    min_spread = 0.025
+    fired = []
+    for t, spread in enumerate((0.03, 0.024, 0.03, 0.024, 0.03)):
+        changes = {"BTCUSDT": _opp(spread) if spread >= min_spread else None}
+        fired += [e.kind for e in engine.evaluate(changes, float(t), {"BTCUSDT": spread})]
+    assert fired == ["new"]
+
+
+def test_disarms_once_below_band(monkeypatch):
+    monkeypatch.setenv("ALERT_COOLDOWN", "0")
+    engine = AlertEngine()
+    fired = []
+    for t, spread in enumerate((0.03, 0.024, 0.01, 0.03)):
+        changes = {"BTCUSDT": _opp(spread) if spread >= 0.025 else None}
+        fired += [e.kind for e in engine.evaluate(changes, float(t), {"BTCUSDT": spread})]
+    assert fired == ["new", "new"]
+
+
+def _book(rates, previous=None):
+    book = SpreadBook(0.025, previous=previous, tolerance=0.0005)
+    book.add([FundingRate(exchange=ex, symbol=sym, rate=rate, timestamp=0.0) for ex, sym, rate in rates])
+    book.ranked()
+    return book
+
+
+def test_book_changes_ignore_jitter_within_tolerance():
+    first = _book([("A", "BTCUSDT", 0.0), ("B", "BTCUSDT", 0.03), ("A", "ETHUSDT", 0.0), ("B", "ETHUSDT", 0.01)])
+    assert set(first.changes()) == {"BTCUSDT", "ETHUSDT"}
+    jitter = _book([("A", "BTCUSDT", 1e-9), ("B", "BTCUSDT", 0.03 + 1e-9), ("A", "ETHUSDT", 0.0), ("B", "ETHUSDT", 0.01)], first)
+    assert jitter.changes() == {}
+    moved = _book([("A", "BTCUSDT", 0.0), ("B", "BTCUSDT", 0.04), ("A", "ETHUSDT", 0.0)], jitter)
+    changes = moved.changes()
+    assert set(changes) == {"BTCUSDT", "ETHUSDT"}
+    assert changes["BTCUSDT"].spread == 0.04 and changes["ETHUSDT"] is None
+
+
+def test_drift_below_tolerance_accumulates():
+    book = _book([("A", "BTCUSDT", 0.0), ("B", "BTCUSDT", 0.03)])
+    book.changes()
+    for step in range(1, 4):
+        book = _book([("A", "BTCUSDT", 0.0), ("B", "BTCUSDT", 0.03 + step * 0.0003)], book)
+        assert bool(book.changes()) == (step == 2)
@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+import pytest
+
+from backfill import HISTORY, Backfill, Checkpoint, FixtureFetcher, _iso
+
+START, END = 1_700_000_000_000, 1_700_086_400_000
+TIMES = (START + 3_600_000, START + 32_400_000, START + 61_200_000)
+
+# One recorded page per venue, in each venue's own response shape
+PAGES = {
+    "GateIO": [{"t": t // 1000, "r": "0.0001"} for t in TIMES],
+    "KuCoin": {"code": "200000", "data": [{"symbol": "XBTUSDTM", "fundingRate": 0.0001, "timepoint": t} for t in TIMES]},
+    "MEXC": {"success": True, "code": 0, "data": {"resultList": [
+        {"symbol": "BTC_USDT", "fundingRate": 0.0001, "settleTime": t} for t in TIMES]}},
+    "HTX": {"status": "ok", "data": {"data": [
+        {"funding_rate": "0.0002", "realized_rate": "0.0001", "funding_time": str(t)} for t in TIMES]}},
+    "BingX": {"code": 0, "data": [{"symbol": "BTC-USDT", "fundingRate": "0.0001", "fundingTime": t} for t in TIMES]},
+    "dYdX": {"historicalFunding": [{"ticker": "BTC-USD", "rate": "0.0001", "effectiveAt": _iso(t)} for t in TIMES]},
+    "Kraken": {"result": "success", "rates": [
+        {"timestamp": _iso(t), "fundingRate": 3.7, "relativeFundingRate": 0.0001} for t in TIMES]},
+    "Phemex": {"code": 0, "data": {"rows": [
+        {"symbol": ".BTCUSDTFR8H", "fundingRate": "0.0001", "fundingTime": t} for t in reversed(TIMES)]}},
+    "CryptoCom": {"code": 0, "result": {"instrument_name": "BTCUSD-PERP", "data": [
+        {"v": "0.0001", "t": t} for t in reversed(TIMES)]}},
+    "Coinbase": {"pagination": {"result_limit": 100, "result_offset": 0}, "results": [
+        {"instrument_id": "BTC-PERP", "funding_rate": "0.0001", "event_time": _iso(t)} for t in reversed(TIMES)]},
+    "CoinEx": {"code": 0, "data": [
+        {"market": "BTCUSDT", "funding_time": t, "actual_funding_rate": "0.0001"} for t in reversed(TIMES)]},
+}
+
+
+class MemoryStore:
+    def __init__(self):
+        self.buffers, self.rows = {}, 0
+
+    def add(self, venue, symbol, rows):
+        self.buffers.setdefault(venue, []).extend(rows)
+        self.rows += len(rows)
+
+    def take(self):
+        buffers, self.buffers, self.rows = self.buffers, {}, 0
+        return buffers
+
+    def write(self, buffers):
+        self.written = buffers
+        return sum(len(rows) for rows in buffers.values())
+
+
+def _replay(tmp_path, venue, symbol, response):
+    spec = HISTORY[venue]
+    fetcher = FixtureFetcher("", str(tmp_path / "fixtures"), replay=True)
+    cursor = {"forward": START, "backward": END, "page": 1}[spec.direction]
+    url, body = spec.request(spec.native(symbol), cursor, START, END)
+    with open(fetcher._path(url, spec.method, body), "w", encoding="utf-8") as f:
+        json.dump({"method": spec.method, "url": url, "body": body, "response": response}, f)
+
+    store = MemoryStore()
+    checkpoint = Checkpoint(str(tmp_path / "_checkpoint.json"), START, END, restart=True)
+    job = Backfill(fetcher, store, checkpoint, START, END, concurrency=4, flush_rows=1000)
+    asyncio.run(job.run([(venue, symbol)]))
+    asyncio.run(job.flush())
+    return job, store
+
+
+@pytest.mark.parametrize("venue", sorted(PAGES))
+def test_replays_recorded_history(venue, tmp_path):
+    job, store = _replay(tmp_path, venue, "BTCUSDT", PAGES[venue])
+    assert sorted(store.written[venue]) == [(t, pytest.approx(0.01)) for t in TIMES]
+    assert job.jobs[f"{venue}:BTCUSDT"]["done"]
+
+
+def test_native_symbols_follow_quote_and_margin():
+    assert HISTORY["Bybit"].native("BTCUSDC") == "BTCPERP"
+    assert HISTORY["Bybit"].native("BTCUSDT") == "BTCUSDT"
+    assert "/futures/usdc/" in HISTORY["GateIO"].request(HISTORY["GateIO"].native("BTCUSDC"), END, START, END)[0]
+    assert "/futures/usdt/" in HISTORY["GateIO"].request(HISTORY["GateIO"].native("BTCUSDT"), END, START, END)[0]
+    assert HISTORY["Kraken"].native("BTCUSD") == "PF_XBTUSD"
+    assert HISTORY["Kraken"].native("BTCUSD-INV") == "PI_XBTUSD"
+
+
+def test_error_payload_leaves_job_open(tmp_path):
+    job, store = _replay(tmp_path, "Bybit", "BTCUSDC", {"retCode": 10001, "retMsg": "params error", "result": {}})
+    assert not job.jobs["Bybit:BTCUSDC"]["done"]
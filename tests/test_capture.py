@@ -0,0 +1,27 @@
+import os
+
+from capture import CaptureLog, read_capture
+
+
+def test_rotates_past_max_bytes(monkeypatch, tmp_path):
+    monkeypatch.setenv("CAPTURE_MAX_BYTES", "2000")
+    monkeypatch.setenv("CAPTURE_BACKUPS", "2")
+    path = str(tmp_path / "athena.capture")
+    log = CaptureLog(path, chunk_records=5, flush_interval=0.1)
+    for i in range(40):
+        log.record("Binance", "https://x", float(i), 0.01, os.urandom(300))
+    log.close()
+    assert log.records + log.dropped == 40
+    files = [p for p in (path, path + ".1", path + ".2") if os.path.exists(p)]
+    assert len(files) == 3 and not os.path.exists(path + ".3")
+    for p in files:
+        assert os.path.exists(p + ".idx") and list(read_capture(p))
+
+
+def test_drops_when_writer_is_behind(monkeypatch, tmp_path):
+    monkeypatch.setenv("CAPTURE_QUEUE", "4")
+    log = CaptureLog(str(tmp_path / "athena.capture"))
+    log.close()  # writer gone: nothing drains the queue
+    for i in range(100):
+        log.record("Binance", "https://x", float(i), 0.01, b"{}")
+    assert log.dropped == 96
@@ -0,0 +1,22 @@
+from adapters import default_exchanges
+from engine import ArbitrageEngine, EngineConfig
+
+
+def test_embedded_engine_ignores_environment(monkeypatch):
+    for name, value in (("EXCHANGES", "Binance"), ("EXCHANGE_PLUGINS", "no_such_module"), ("HEDGE", "1"),
+                        ("CAPTURE_PATH", "/nonexistent/athena.capture"), ("STATS_HALF_LIFE", "1"),
+                        ("STATS_ROUTES", "9"), ("FRESHNESS_SKEW_WINDOW", "3")):
+        monkeypatch.setenv(name, value)
+    engine = ArbitrageEngine(EngineConfig(stats_routes=2))
+    assert [s.name for s in engine.fetcher.adapters] == default_exchanges()
+    assert engine.fetcher.hedge is False and engine.fetcher.capture is None
+    assert engine.stats.half_life == 3600.0 and engine.stats.routes_per_symbol == 2
+    assert engine.freshness.skew_window == 64
+
+
+def test_from_env_reads_environment(monkeypatch):
+    monkeypatch.setenv("EXCHANGES", "Binance,OKX")
+    monkeypatch.setenv("HEDGE", "1")
+    engine = ArbitrageEngine(EngineConfig.from_env())
+    assert [s.name for s in engine.fetcher.adapters] == ["Binance", "OKX"]
+    assert engine.fetcher.hedge is True
@@ -0,0 +1,27 @@
+from freshness import FreshnessTracker
+from models import FundingRate
+
+
+def _rate(event_time, received):
+    return FundingRate(exchange="A", symbol="BTCUSDT", rate=0.01, timestamp=received, event_time=event_time)
+
+
+def test_frozen_venue_keeps_ageing():
+    tracker = FreshnessTracker(skew_window=64, age_window=512, max_skew=10)
+    start = 1_700_000_000.0
+    for i in range(10):  # healthy: event time tracks receive time with 0.2s lag
+        tracker.observe([_rate(start + i * 2, start + i * 2 + 0.2)])
+    frozen = start + 18
+    for i in range(10, 410):  # payload stops updating, 2s cycles
+        tracker.observe([_rate(frozen, start + i * 2)])
+    now = start + 409 * 2
+    assert tracker.age(_rate(frozen, now), now) > 780
+    assert abs(tracker.offset["A"] - 0.2) < 1e-6
+
+
+def test_stale_at_first_sight_is_not_skew():
+    tracker = FreshnessTracker(skew_window=64, age_window=512, max_skew=10)
+    now = 1_700_000_000.0
+    tracker.observe([_rate(now - 1000, now)])
+    assert tracker.offset["A"] == 10
+    assert tracker.age(_rate(now - 1000, now), now) == 990
@@ -0,0 +1,40 @@
+from history import HistoryStore, Series
+
+
+def test_series_one_point_per_bucket_at_fast_cadence():
+    series = Series()
+    start = 1_700_000_000.0
+    for i in range(1800):  # one hour of 2s samples
+        series.add(start + i * 2, float(i), 60.0, 10_000)
+    assert 60 <= len(series.ts) <= 61
+    # Each bucket keeps its newest sample
+    assert series.values[-1] == 1799.0
+
+
+def test_history_endpoint_series_density():
+    store = HistoryStore()
+    store.resolution, store.max_points = 60.0, 1440
+    series = Series()
+    store.spreads["BTCUSDT"] = series
+    start = 1_700_000_000.0
+    for i in range(1800):
+        series.add(start + i * 2, 0.1, store.resolution, store.max_points)
+    points = store.spread("BTCUSDT", start, start + 3600, 500)
+    assert 60 <= len(points) <= 61
+
+
+def test_rates_filed_under_group_name():
+    from models import FundingRate
+    store = HistoryStore()
+    ts = 1_700_000_000.0
+    rates = [FundingRate(exchange="Binance", symbol=s, rate=0.01, timestamp=ts) for s in ("BTCUSDT", "BTCUSDC")]
+    store.record(rates, {}, ts)
+    assert store.exchanges("BTCUSDT") == ["Binance", "Binance BTCUSDC"]
+
+
+def test_spread_series_has_no_gaps_below_min_spread():
+    store = HistoryStore()
+    start = 1_700_000_000.0
+    for i in range(10):
+        store.record([], {"BTCUSDT": 0.03 if i % 2 else 0.001}, start + i * 60)
+    assert len(store.spreads["BTCUSDT"].ts) == 10
@@ -0,0 +1,26 @@
+import asyncio
+
+from notifier import TelegramNotifier
+
+
+def test_slow_chat_does_not_delay_others(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "token")
+    monkeypatch.setenv("TELEGRAM_CHAT_IDS", "slow,fast")
+    notifier = TelegramNotifier()
+    delivered = []
+
+    async def post(chat_id, text, limiter):
+        if chat_id == "slow": await asyncio.sleep(60)
+        delivered.append((chat_id, text))
+        return True
+    notifier._post = post
+
+    async def run():
+        for text in ("one", "two"):
+            await notifier.send_message(text)
+        await asyncio.wait_for(notifier.queues["fast"].join(), 1)
+        assert notifier.queues["slow"].qsize() == 1
+        await notifier.close()
+
+    asyncio.run(run())
+    assert delivered == [("fast", "one"), ("fast", "two")]
@@ -0,0 +1,31 @@
+from models import FundingRate
+from spread_book import SpreadBook
+from spread_stats import SpreadStatsTracker
+
+
+def test_stats_see_spreads_below_min_spread():
+    tracker = SpreadStatsTracker(threshold=0.025)
+    for t, spread in enumerate((0.03, 0.01, 0.01, 0.01, 0.03)):
+        book = SpreadBook(0.025)
+        book.add([FundingRate(exchange="A", symbol="BTCUSDT", rate=0.0, timestamp=float(t)),
+                  FundingRate(exchange="B", symbol="BTCUSDT", rate=spread, timestamp=float(t))])
+        opps = tracker.annotate(book.ranked(), float(t), book.routes())
+    (o,) = opps
+    assert o.observations == 5
+    assert abs(o.spread_mean - 0.018) < 1e-9
+    assert o.time_above == 0.0  # the dip below threshold broke the streak
+
+
+def test_streak_survives_near_equal_venues_swapping():
+    tracker = SpreadStatsTracker(threshold=0.025)
+    start = 1_700_000_000.0
+    for i in range(20):  # 10 minutes apart, B and C trade the top spot by 1e-4
+        ts = start + i * 600
+        b, c = (0.12, 0.1199) if i % 2 else (0.1199, 0.12)
+        book = SpreadBook(0.025)
+        book.add([FundingRate(exchange=ex, symbol="BTCUSDT", rate=rate, timestamp=ts)
+                  for ex, rate in (("A", 0.0), ("B", b), ("C", c))])
+        opps = tracker.annotate(book.ranked(), ts, book.routes(tracker.routes_per_symbol, tracker.streaking))
+    assert opps[0].time_above == 19 * 600
+    for short in ("B", "C"):
+        assert tracker.pairs[("BTCUSDT", "A", short)].time_above(ts) == 19 * 600
@@ -0,0 +1,28 @@
+import asyncio
+
+from models import Opportunity
+from notifier import TelegramNotifier
+from subscriptions import Subscription
+
+
+def _opp(spread):
+    return Opportunity(symbol="BTCUSDT", long_exchange="Binance", long_rate=0.0, short_exchange="Bybit",
+                       short_rate=spread, spread=spread, annualized_spread=spread * 1095)
+
+
+def test_chat_min_spread_gets_its_own_crossing(monkeypatch, tmp_path):
+    monkeypatch.setenv("ALERT_COOLDOWN", "0")
+    monkeypatch.setenv("SUBSCRIPTIONS_PATH", str(tmp_path / "subscriptions.json"))
+    monkeypatch.setenv("TELEGRAM_CHAT_IDS", "")
+    notifier = TelegramNotifier()
+    notifier.subscriptions.put(Subscription("1", min_spread=0.05))
+    notifier.subscriptions.save()
+    sent = []
+
+    async def send(message, chat_ids=None):
+        sent.append((message, chat_ids))
+    notifier.send_message = send
+
+    for spread in (0.03, 0.06, 0.07):
+        asyncio.run(notifier.process([_opp(spread)], {"BTCUSDT": spread}))
+    assert len(sent) == 1 and sent[0][1] == ["1"]
@@ -0,0 +1,30 @@
+import web_dashboard
+from tracer import tracer
+
+
+def test_trace_trigger_is_local_only_and_clamped(monkeypatch):
+    monkeypatch.setattr(web_dashboard, "TRACE_TOKEN", "")
+    monkeypatch.setattr(tracer, "trigger", lambda cycles: None)
+    client = web_dashboard.app.test_client()
+    remote = client.post("/api/trace?cycles=5", environ_base={"REMOTE_ADDR": "203.0.113.7"})
+    assert remote.status_code == 403
+    local = client.post("/api/trace?cycles=1000000")
+    assert local.status_code == 200 and local.get_json()["armed"] == web_dashboard.TRACE_MAX_CYCLES
+    assert client.post("/api/trace?cycles=-50").get_json()["armed"] == tracer.trigger_cycles
+
+
+def test_trace_trigger_token(monkeypatch):
+    monkeypatch.setattr(web_dashboard, "TRACE_TOKEN", "s3cret")
+    monkeypatch.setattr(tracer, "trigger", lambda cycles: None)
+    client = web_dashboard.app.test_client()
+    assert client.post("/api/trace").status_code == 403
+    ok = client.post("/api/trace", headers={"X-Trace-Token": "s3cret"}, environ_base={"REMOTE_ADDR": "203.0.113.7"})
+    assert ok.status_code == 200
+
+
+def test_provisional_update_keeps_cycle_metrics():
+    web_dashboard.update_dashboard_data([], 10, {"provisional": False, "freshness": {"Binance": {"skew": 0.1}}})
+    web_dashboard.update_dashboard_data([], 12, {"provisional": True})
+    client = web_dashboard.app.test_client()
+    assert client.get("/api/freshness").get_json() == {"Binance": {"skew": 0.1}}
+    assert client.get("/api/data").get_json()["metadata"]["provisional"] is True
@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import queue
+import random
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Optional
+
+logger = logging.getLogger("Tracer")
+logger.setLevel(logging.INFO)
+
+# Each concurrent coroutine (one per exchange) draws on its own timeline row
+_lane = contextvars.ContextVar("trace_lane", default=0)
+
+
+class Tracer:
+    """Records nested cycle spans as Chrome trace events (chrome://tracing, Perfetto)."""
+
+    def __init__(self):
+        self.enabled = False
+        self.sample_rate = 1.0
+        self.path = "/tmp/athena-trace.json"
+        self.max_bytes = 50 * 1024 * 1024
+        self.backups = 3
+        self.trigger_cycles = 5
+
+        self._lock = threading.RLock()  # re-entrant: trigger() may run inside a signal handler
+        self._forced = 0
+        self._events: Optional[list] = None
+        self._lanes = {}
+        self._pid = os.getpid()
+        self._queue = queue.SimpleQueue()
+        self._writer = None
+
+    def configure_from_env(self):
+        self.enabled = os.getenv("TRACE_ENABLED", "0") == "1"
+        self.sample_rate = float(os.getenv("TRACE_SAMPLE_RATE", 1.0))
+        self.path = os.getenv("TRACE_PATH", self.path)
+        self.max_bytes = int(os.getenv("TRACE_MAX_BYTES", self.max_bytes))
+        self.backups = int(os.getenv("TRACE_BACKUPS", self.backups))
+        self.trigger_cycles = int(os.getenv("TRACE_TRIGGER_CYCLES", self.trigger_cycles))
+
+    def trigger(self, cycles: int = 0):
+        # Safe from signal handlers and the Flask thread
+        with self._lock:
+            self._forced += cycles or self.trigger_cycles
+        logger.info(f"Trace capture armed for next {cycles or self.trigger_cycles} cycles")
+
+    @property
+    def recording(self) -> bool:
+        return self._events is not None
+
+    def begin_cycle(self) -> bool:
+        with self._lock:
+            if self._forced > 0:
+                self._forced -= 1
+                record = True
+            else:
+                record = self.enabled and random.random() < self.sample_rate
+        self._events = [] if record else None
+        return record
+
+    def end_cycle(self):
+        events, self._events = self._events, None
+        if not events: return
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name="trace-writer", daemon=True)
+            self._writer.start()
+        self._queue.put(events)
+
+    @contextmanager
+    def span(self, name: str, **args):
+        events = self._events
+        if events is None:
+            yield
+            return
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            event = {"name": name, "ph": "X", "ts": start // 1000, "dur": (end - start) // 1000,
+                     "pid": self._pid, "tid": _lane.get()}
+            if args: event["args"] = args
+            events.append(event)
+
+    @contextmanager
+    def lane(self, name: str):
+        tid = self._lanes.get(name)
+        if tid is None:
+            tid = self._lanes[name] = len(self._lanes) + 1
+        if self._events is not None:
+            self._events.append({"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}})
+        token = _lane.set(tid)
+        try:
+            yield
+        finally:
+            _lane.reset(token)
+
+    # FILE OUTPUT (background thread, never on the event loop)
+    def _write_loop(self):
+        while True:
+            events = self._queue.get()
+            try:
+                self._append(events)
+            except OSError as e:
+                logger.error(f"Trace write failed: {e}")
+
+    def _append(self, events: list):
+        if os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+            self._rotate()
+        fresh = not os.path.exists(self.path)
+        with open(self.path, "a", encoding="utf-8") as f:
+            # JSON array format: the closing bracket is optional for trace viewers
+            if fresh: f.write("[\n")
+            f.write("".join(json.dumps(e, separators=(",", ":")) + ",\n" for e in events))
+
+    def _rotate(self):
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src): os.replace(src, f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+
+tracer = Tracer()